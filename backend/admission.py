@@ -0,0 +1,174 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable
+
+from fastapi import HTTPException, Request, status
+
+from cache import TTLCache
+
+# At most this many requests per auth route run at once (each one is a
+# users lookup plus a bcrypt call); a few more may wait briefly for a slot
+AUTH_CONCURRENCY_LIMIT = int(os.getenv("AUTH_CONCURRENCY_LIMIT", 2 * (os.cpu_count() or 2)))
+AUTH_QUEUE_LIMIT = int(os.getenv("AUTH_QUEUE_LIMIT", 32))
+AUTH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AUTH_QUEUE_TIMEOUT_SECONDS", 2))
+AUTH_RETRY_AFTER_SECONDS = int(os.getenv("AUTH_RETRY_AFTER_SECONDS", 1))
+
+# Token buckets: `burst` attempts at once, refilling at the per-minute rate
+AUTH_IP_RATE_PER_MINUTE = float(os.getenv("AUTH_IP_RATE_PER_MINUTE", 30))
+AUTH_IP_BURST = int(os.getenv("AUTH_IP_BURST", 10))
+AUTH_EMAIL_RATE_PER_MINUTE = float(os.getenv("AUTH_EMAIL_RATE_PER_MINUTE", 6))
+AUTH_EMAIL_BURST = int(os.getenv("AUTH_EMAIL_BURST", 5))
+# Bounds the memory held for buckets; the least recently used are dropped
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+# Only behind a proxy that sets X-Forwarded-For, or clients can pick their IP
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+
+
+class ConcurrencyLimiter:
+    """
+    Caps how many requests of one route run at once. Past the limit up to
+    `max_queue` requests wait up to `queue_timeout` seconds for a slot;
+    anything beyond that is shed immediately with a 503 and Retry-After,
+    rather than queueing behind a burst it can't get through.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.running = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def _shed(self):
+        self.shed += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Too many {self.name} requests in progress, please retry",
+            headers={"Retry-After": str(AUTH_RETRY_AFTER_SECONDS)},
+        )
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self._shed()
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._shed()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+
+        self.running += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class RateLimiter:
+    """
+    In-memory token bucket per key (a client IP, an email address). Buckets
+    idle long enough to be full again expire from the cache, so only
+    recently active keys take memory. `clock` is injectable for tests.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, max_keys: int = RATE_LIMIT_MAX_KEYS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self._buckets = TTLCache(maxsize=max_keys, ttl=burst / self.rate)
+        self.limited = 0
+
+    def hit(self, key: str) -> float:
+        """
+        Takes a token for `key`. Returns 0 when allowed, otherwise the
+        seconds until the next token is available.
+        """
+        now = self.clock()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            self.limited += 1
+            return (1 - tokens) / self.rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+    def check(self, key: str):
+        retry_after = self.hit(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please retry later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "limited": self.limited,
+        }
+
+
+ip_limiter = RateLimiter("ip", AUTH_IP_RATE_PER_MINUTE, AUTH_IP_BURST)
+email_limiter = RateLimiter("email", AUTH_EMAIL_RATE_PER_MINUTE, AUTH_EMAIL_BURST)
+auth_limiters = {
+    route: ConcurrencyLimiter(route, AUTH_CONCURRENCY_LIMIT, AUTH_QUEUE_LIMIT, AUTH_QUEUE_TIMEOUT_SECONDS)
+    for route in ("login", "signup")
+}
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+@asynccontextmanager
+async def admit_auth(request: Request, route: str, email: str):
+    """
+    Admission for the auth routes: rate limited per client IP and per email
+    (429), then run within the route's concurrency limit (503 when full).
+    Catalog routes don't go through this, so they never wait on auth work.
+    """
+    ip_limiter.check(client_ip(request))
+    email_limiter.check(email.lower())
+    async with auth_limiters[route].slot():
+        yield
+
+
+def admission_stats() -> dict:
+    return {
+        **{route: limiter.stats() for route, limiter in auth_limiters.items()},
+        "per_ip": ip_limiter.stats(),
+        "per_email": email_limiter.stats(),
+    }
@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import time
+from typing import List
+
+from fastapi import FastAPI, Request
+
+from models import MuseumObject
+from catalog import to_public
+from http_cache import build_entry, entry_response
+
+# Benchmarks the per-request CPU cost of serving a Large (8 object) tour the
+# old way (raw Mongo dicts re-validated against response_model and re-encoded
+# by FastAPI on every request) versus the pre-serialized path the catalog
+# endpoints now use. No database or network is involved: both apps are
+# driven directly through ASGI so only the framework work is measured.
+
+ITERATIONS = 5000
+
+def make_large_tour():
+    return [
+        {
+            "_id": f"obj-{i:03d}",
+            "id": f"obj-{i:03d}",
+            "title": f"Roman Artifact {i}",
+            "shortDescription": "A short description of the object on display.",
+            "contextualBackground": "Long contextual background about the object and its history. " * 8,
+            "galleryLocation": f"Floor {i % 3 + 1}, Room {100 + i}",
+            "image": f"https://images.pexels.com/photos/{1000 + i}/pexels-photo.jpeg?auto=compress&w=940",
+            "themeIds": ["roman-empire", "warfare"],
+            "mapPosition": {"top": f"{10 + i * 5}%", "left": f"{80 - i * 5}%"},
+        }
+        for i in range(8)
+    ]
+
+def build_apps(tour):
+    baseline = FastAPI()
+
+    @baseline.get("/tour", response_model=List[MuseumObject], response_model_by_alias=False)
+    async def baseline_tour():
+        return tour
+
+    fast = FastAPI()
+    entry = build_entry(to_public(MuseumObject, tour))
+
+    @fast.get("/tour", response_model=List[MuseumObject], response_model_by_alias=False)
+    async def fast_tour(request: Request):
+        return await entry_response(request, entry)
+
+    return baseline, fast
+
+async def call(app, path="/tour"):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+async def measure(app, iterations):
+    # Warm up routing and pydantic validators
+    for _ in range(100):
+        await call(app)
+    start = time.process_time()
+    for _ in range(iterations):
+        await call(app)
+    return (time.process_time() - start) / iterations
+
+async def main(iterations):
+    tour = make_large_tour()
+    baseline, fast = build_apps(tour)
+
+    # Both paths must produce the same document
+    import json
+    assert json.loads(await call(baseline)) == json.loads(await call(fast))
+
+    baseline_cpu = await measure(baseline, iterations)
+    fast_cpu = await measure(fast, iterations)
+
+    print(f"Large tour ({len(tour)} objects), {iterations} requests each")
+    print(f"response_model path:  {baseline_cpu * 1e6:8.1f} us CPU/request")
+    print(f"pre-serialized path:  {fast_cpu * 1e6:8.1f} us CPU/request")
+    print(f"saved:                {(baseline_cpu - fast_cpu) * 1e6:8.1f} us CPU/request "
+          f"({(1 - fast_cpu / baseline_cpu) * 100:.1f}%)")
+
+if __name__ == "__main__":
+    iterations = ITERATIONS
+    if len(sys.argv) > 1:
+        iterations = int(sys.argv[1])
+    asyncio.run(main(iterations))
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+CATALOG_CACHE_MAXSIZE = int(os.getenv("CATALOG_CACHE_MAXSIZE", 2048))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", 300))
+CATALOG_PAGE_CACHE_MAXSIZE = int(os.getenv("CATALOG_PAGE_CACHE_MAXSIZE", 256))
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    Entries are kept in an OrderedDict ordered by recency of use, so both
+    lookups and evictions are O(1). Expired entries are dropped lazily on
+    access, and the least recently used entry is evicted once maxsize is hit.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        return self._data.pop(key, _MISSING) is not _MISSING
+
+    def invalidate_matching(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        stale = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+        for key in stale:
+            del self._data[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical loads: the first caller for a key starts
+    the load as a task and later callers await that same task instead of
+    repeating the work. Every waiter gets the result, or the exception.
+
+    Waiters await through asyncio.shield, so a cancelled request (e.g. a
+    client disconnect) doesn't cancel the load for the others; the load is
+    only cancelled once no waiters remain.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.loads = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, load: Callable):
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(load())
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda _: self._flights.pop(key, None) if self._flights.get(key) is flight else None)
+            self.loads += 1
+        else:
+            self.coalesced += 1
+
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and flight[1] == 1:
+                # Unregister first, so a request arriving while the task
+                # winds down starts a fresh load instead of joining it
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                task.cancel()
+            raise
+        finally:
+            flight[1] -= 1
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._flights), "loads": self.loads, "coalesced": self.coalesced}
+
+
+# Themes, objects and tours only change when seed.py runs, so catalog reads
+# go through this cache instead of hitting MongoDB on every request.
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_MAXSIZE, ttl=CATALOG_CACHE_TTL_SECONDS)
+# Listing pages past the first (or with a non-default limit or projection)
+# are keyed by whatever the client sends, so a crawler could otherwise push
+# the hot entries out of catalog_cache. They get their own small cache.
+page_cache = TTLCache(maxsize=CATALOG_PAGE_CACHE_MAXSIZE, ttl=CATALOG_CACHE_TTL_SECONDS)
+# Concurrent misses for the same catalog key share one MongoDB read
+catalog_flights = SingleFlight()
+
+
+def invalidate_catalog(kind: Optional[str] = None) -> int:
+    """
+    Drops cached catalog entries. Keys are tuples whose first element is the
+    entry kind ("themes", "theme", "theme_objects", "object", "tour"); pass a
+    kind to drop only that family, or nothing to drop everything.
+    """
+    if kind is None:
+        count = len(catalog_cache) + len(page_cache)
+        catalog_cache.clear()
+        page_cache.clear()
+        return count
+    return sum(cache.invalidate_matching(lambda key, _: key[0] == kind) for cache in (catalog_cache, page_cache))
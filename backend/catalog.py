@@ -0,0 +1,333 @@
+import asyncio
+import heapq
+import os
+import uuid
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import orjson
+from pydantic import ConfigDict, create_model
+from locations import object_location
+from tour_planner import TOUR_ENTRANCE, plan_route, walking_cost
+
+# Numeric tours plan over at most this many of the theme's objects, those
+# nearest the starting point; the route never strays further than that
+TOUR_PLAN_MAX_CANDIDATES = int(os.getenv("TOUR_PLAN_MAX_CANDIDATES", 500))
+
+# Named projections for MuseumObject. "summary" is what tour and listing
+# screens actually render; None means the full document.
+OBJECT_VIEWS = {
+    "summary": ("id", "title", "image", "galleryLocation", "mapPosition"),
+    "full": None,
+}
+
+
+def parse_fields(model, fields: Optional[str] = None, view: Optional[str] = None):
+    """
+    Resolves a `fields=a,b` list or a named `view` into a tuple of model
+    field names (in declaration order), or None for the full document. Raises ValueError for
+    unknown fields or views. "id" is always included.
+    """
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+    elif view:
+        if view not in OBJECT_VIEWS:
+            raise ValueError(f"Unknown view '{view}' (expected one of: {', '.join(OBJECT_VIEWS)})")
+        requested = OBJECT_VIEWS[view]
+        if requested is None:
+            return None
+        requested = set(requested)
+    else:
+        return None
+
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    requested.add("id")
+    if requested == set(model.model_fields):
+        return None
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def mongo_projection(model, fields):
+    """
+    Translates model field names into a MongoDB projection, mapping aliased
+    fields (id -> _id) back to their stored names.
+    """
+    if fields is None:
+        return None
+    projection = {}
+    for name in fields:
+        projection[model.model_fields[name].alias or name] = 1
+    return projection
+
+
+@lru_cache(maxsize=None)
+def partial_model(model, fields):
+    """
+    Model containing only `fields` of `model`, so projected documents are
+    still validated against the original field definitions.
+    """
+    if fields is None:
+        return model
+    definitions = {name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    return create_model(
+        f"{model.__name__}Partial",
+        __config__=ConfigDict(populate_by_name=True),
+        **definitions,
+    )
+
+
+def to_public(model, value):
+    """
+    Validates raw MongoDB documents against their response model and dumps
+    them with public field names ("id" rather than "_id"). Accepts a single
+    document or a list of them.
+    """
+    if isinstance(value, list):
+        return [model.model_validate(doc).model_dump() for doc in value]
+    return model.model_validate(value).model_dump()
+
+
+def keyset_filter(base: dict, after=None) -> dict:
+    """
+    Adds the keyset condition for cursor pagination on _id. Listings are
+    always sorted by _id so "everything after the last id seen" is a stable,
+    index-backed cursor regardless of how deep the page is.
+    """
+    query = dict(base)
+    if after is not None:
+        query["_id"] = {"$gt": after}
+    return query
+
+
+async def fetch_page(collection, base: dict, after, limit: int, projection: dict = None):
+    """
+    Returns one page of documents and the cursor for the next page (None
+    when this is the last page). One extra document is read to tell the two
+    apart without a count query.
+    """
+    cursor = collection.find(keyset_filter(base, after), projection).sort("_id", 1).limit(limit + 1)
+    docs = await cursor.to_list(length=limit + 1)
+    if len(docs) > limit:
+        return docs[:limit], docs[limit - 1]["_id"]
+    return docs, None
+
+
+async def iterate(documents):
+    """
+    Wraps an in-memory iterable so it can stand in for a Motor cursor.
+    """
+    for doc in documents:
+        yield doc
+
+
+async def stream_ndjson(cursor, model):
+    """
+    Yields one validated JSON document per line straight off the Motor
+    cursor, so only a single batch is ever held in memory.
+    """
+    async for doc in cursor:
+        yield orjson.dumps(to_public(model, doc)) + b"\n"
+
+
+def order_by_ids(ids: list, found: dict):
+    """
+    Re-threads documents fetched with $in (which doesn't guarantee order)
+    into the order of `ids`. Returns the ordered documents and the ids that
+    had no match.
+    """
+    ordered = []
+    missing = []
+    for oid in ids:
+        if oid in found:
+            ordered.append(found[oid])
+        else:
+            missing.append(oid)
+    return ordered, missing
+
+
+def tour_pipeline(theme_id: str, size: str, projection: dict = None) -> list:
+    """
+    Aggregation pipeline resolving a tour into its ordered, fully populated
+    objects in a single round-trip.
+
+    $lookup does not preserve the order of objectIds, so the looked-up
+    documents are re-threaded server-side by mapping over objectIds and
+    picking each match by index. Ids with no matching object are dropped,
+    mirroring the previous Python reorder. A projection is applied inside the
+    $lookup so unneeded fields never leave the server.
+    """
+    lookup = {
+        "from": "objects",
+        "localField": "objectIds",
+        "foreignField": "_id",
+        "as": "resolved",
+    }
+    if projection is not None:
+        lookup["pipeline"] = [{"$project": {**projection, "_id": 1}}]
+
+    return [
+        {"$match": {"themeId": theme_id, "size": size}},
+        {"$limit": 1},
+        {"$lookup": lookup},
+        {"$project": {
+            "_id": 0,
+            "objects": {
+                "$filter": {
+                    "input": {
+                        "$map": {
+                            "input": {"$ifNull": ["$objectIds", []]},
+                            "as": "oid",
+                            "in": {
+                                "$let": {
+                                    "vars": {"idx": {"$indexOfArray": ["$resolved._id", "$$oid"]}},
+                                    "in": {
+                                        "$cond": [
+                                            {"$gte": ["$$idx", 0]},
+                                            {"$arrayElemAt": ["$resolved", "$$idx"]},
+                                            None,
+                                        ]
+                                    },
+                                }
+                            },
+                        }
+                    },
+                    "as": "obj",
+                    "cond": {"$ne": ["$$obj", None]},
+                }
+            },
+        }},
+    ]
+
+
+async def resolve_tour(database, theme_id: str, size: str, projection: dict = None):
+    """
+    Returns the ordered objects of a tour, or None if no tour configuration
+    matches (theme_id, size).
+    """
+    cursor = database.tours.aggregate(tour_pipeline(theme_id, size, projection))
+    results = await cursor.to_list(length=1)
+    if not results:
+        return None
+    return results[0]["objects"]
+
+
+# What the tour planner needs from each object, on top of any projection
+LOCATION_FIELDS = {"location": 1, "galleryLocation": 1, "mapPosition": 1}
+
+
+async def tour_candidates(database, theme_id: str, snapshot=None) -> list:
+    """
+    Returns (id, Location) for every object in a theme, reading only the
+    location fields.
+    """
+    if snapshot is not None:
+        return snapshot.theme_locations(theme_id)
+    cursor = database.objects.find({"themeIds": theme_id}, {"_id": 1, **LOCATION_FIELDS}).sort("_id", 1)
+    return [(obj["_id"], object_location(obj)) async for obj in cursor]
+
+
+def nearest_candidates(candidates: list, origin, limit: int) -> list:
+    """
+    Keeps the `limit` candidates closest to `origin`, in their original
+    order so plans stay deterministic.
+    """
+    if len(candidates) <= limit:
+        return candidates
+    keep = heapq.nsmallest(limit, range(len(candidates)), key=lambda i: (walking_cost(origin, candidates[i][1]), i))
+    return [candidates[i] for i in sorted(keep)]
+
+
+async def plan_tour(database, theme_id: str, size: str, count: int = None, start: str = None, projection: dict = None, snapshot=None):
+    """
+    Returns a tour's objects in walking order (see tour_planner), or None if
+    there is no such tour.
+
+    Named sizes (count=None) reorder the objects of the stored tour
+    configuration; numeric sizes pick `count` objects from the whole theme.
+    `start` is the id of the object the visitor is standing at: the route
+    begins there, or nearby if it isn't part of the tour. Raises ValueError
+    for an unknown start object. Reads come from `snapshot` when given
+    (see snapshot.py), otherwise from MongoDB.
+    """
+    fetch_projection = None if projection is None else {**projection, **LOCATION_FIELDS}
+
+    start_obj = None
+    if start is not None:
+        if snapshot is not None:
+            start_obj = snapshot.object(start)
+        else:
+            start_obj = await database.objects.find_one({"_id": start}, LOCATION_FIELDS)
+        if start_obj is None:
+            raise ValueError(f"Unknown start object '{start}'")
+    origin = object_location(start_obj) if start_obj is not None else None
+
+    if count is None:
+        if snapshot is not None:
+            objects = snapshot.tour(theme_id, size)
+        else:
+            objects = await resolve_tour(database, theme_id, size, fetch_projection)
+        if objects is None:
+            return None
+        ids = [obj["_id"] for obj in objects]
+        first = ids.index(start) if start in ids else None
+        order = plan_route([object_location(obj) for obj in objects], count, origin, first)
+        return [objects[i] for i in order]
+
+    # Plan on locations alone, then fetch just the chosen objects
+    candidates = await tour_candidates(database, theme_id, snapshot)
+    if not candidates:
+        return None
+    candidates = nearest_candidates(candidates, origin or TOUR_ENTRANCE, TOUR_PLAN_MAX_CANDIDATES)
+    ids = [object_id for object_id, _ in candidates]
+    first = ids.index(start) if start in ids else None
+    # Nearest neighbour and 2-opt are CPU-bound; keep them off the event loop
+    order = await asyncio.to_thread(plan_route, [location for _, location in candidates], count, origin, first)
+    chosen = [ids[i] for i in order]
+
+    if snapshot is not None:
+        return [snapshot.object(object_id) for object_id in chosen]
+    found = {obj["_id"]: obj async for obj in database.objects.find({"_id": {"$in": chosen}}, projection)}
+    ordered, _ = order_by_ids(chosen, found)
+    return ordered
+
+
+# seed.py and generate_catalog.py bump this after changing the catalog, so
+# in-memory structures built from it (e.g. the search index) know to rebuild
+CATALOG_META_ID = "catalog"
+
+
+class CatalogState(NamedTuple):
+    """
+    Identifies one state of one catalog. Versions count up from 1 in every
+    database, so the random generation id set when a catalog is first
+    stamped tells catalogs in different databases apart.
+    """
+    generation: Optional[str]
+    version: Optional[int]
+
+
+async def catalog_state(database) -> CatalogState:
+    meta = await database.catalog_meta.find_one({"_id": CATALOG_META_ID})
+    if meta is None:
+        return CatalogState(None, None)
+    return CatalogState(meta.get("generation"), meta.get("version"))
+
+
+async def ensure_catalog_generation(database):
+    # Catalogs stamped before generation ids existed get one here
+    await database.catalog_meta.update_one(
+        {"_id": CATALOG_META_ID, "generation": {"$exists": False}},
+        {"$set": {"generation": uuid.uuid4().hex}},
+    )
+
+
+async def bump_catalog_version(database):
+    await database.catalog_meta.update_one(
+        {"_id": CATALOG_META_ID},
+        {"$inc": {"version": 1}, "$currentDate": {"updatedAt": True}},
+        upsert=True,
+    )
+    await ensure_catalog_generation(database)
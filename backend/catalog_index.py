@@ -0,0 +1,88 @@
+import asyncio
+import os
+import time
+from typing import Callable, Optional
+
+from catalog import catalog_state
+
+CATALOG_INDEX_REFRESH_SECONDS = float(os.getenv("CATALOG_INDEX_REFRESH_SECONDS", 30))
+
+
+class CatalogIndex:
+    """
+    Keeps an in-memory structure built from the objects collection (e.g. the
+    search index) in step with the catalog.
+
+    At most every CATALOG_INDEX_REFRESH_SECONDS a request checks the catalog
+    state (see catalog.bump_catalog_version); when it changed, the index is
+    rebuilt in the background while the previous one keeps serving. Only the
+    very first request waits for a build.
+    """
+
+    def __init__(self, name: str, build: Callable, fields, refresh_seconds: float = CATALOG_INDEX_REFRESH_SECONDS):
+        self.name = name
+        self.build = build
+        self.projection = {field: 1 for field in fields if field != "id"}
+        self.refresh_seconds = refresh_seconds
+        self.index = None
+        self.state = None
+        self.checked_at = 0.0
+        self.builds = 0
+        self.last_build_seconds = 0.0
+        self._lock = asyncio.Lock()
+        self._rebuild: Optional[asyncio.Task] = None
+
+    async def _build(self, database, state, snapshot=None):
+        start = time.perf_counter()
+        # Converting the snapshot's records and building over a large catalog
+        # are CPU-bound and only touch local data, so both run off the event
+        # loop; only the MongoDB fetch stays on it
+        if snapshot is not None:
+            documents = await asyncio.to_thread(snapshot.object_documents)
+        else:
+            documents = await database.objects.find({}, self.projection).to_list(length=None)
+        self.index = await asyncio.to_thread(self.build, documents)
+        self.state = state
+        self.builds += 1
+        self.last_build_seconds = time.perf_counter() - start
+        print(f"Built {self.name} over {len(documents)} objects in {self.last_build_seconds:.2f}s")
+
+    async def _rebuild_in_background(self, database, state, snapshot):
+        try:
+            await self._build(database, state, snapshot)
+        except Exception as e:
+            # Anything, not just PyMongoError: a malformed document would
+            # otherwise end the task silently. Keep serving the previous
+            # index; the next check retries
+            self.state = None
+            print(f"Failed to rebuild {self.name}: {e!r}")
+
+    def _fresh(self) -> bool:
+        return self.index is not None and time.monotonic() - self.checked_at < self.refresh_seconds
+
+    async def get_index(self, database, snapshot=None):
+        """
+        Returns the current index. With a catalog snapshot (see snapshot.py),
+        its state and documents are used and MongoDB isn't queried.
+        """
+        if self._fresh():
+            return self.index
+
+        async with self._lock:
+            if self._fresh():
+                return self.index
+            self.checked_at = time.monotonic()
+            state = snapshot.state if snapshot is not None else await catalog_state(database)
+            if self.index is None:
+                await self._build(database, state, snapshot)
+            elif state != self.state and (self._rebuild is None or self._rebuild.done()):
+                self._rebuild = asyncio.create_task(self._rebuild_in_background(database, state, snapshot))
+        return self.index
+
+    def stats(self) -> dict:
+        return {
+            **(self.index.stats() if self.index is not None else {}),
+            "catalog_version": self.state.version if self.state is not None else None,
+            "builds": self.builds,
+            "last_build_seconds": round(self.last_build_seconds, 3),
+        }
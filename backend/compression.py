@@ -0,0 +1,116 @@
+import asyncio
+import gzip
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 9))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 11))
+# Everything else gets fast levels: bodies built per request (bulk
+# fetches, search, nearby) and bodies keyed by client-chosen parameters
+# (listing pages, projections, tours from a start object), any of which
+# can be a new ETag
+DYNAMIC_GZIP_LEVEL = int(os.getenv("DYNAMIC_GZIP_LEVEL", 5))
+DYNAMIC_BROTLI_QUALITY = int(os.getenv("DYNAMIC_BROTLI_QUALITY", 4))
+COMPRESSED_VARIANT_CACHE_MAXSIZE = int(os.getenv("COMPRESSED_VARIANT_CACHE_MAXSIZE", 4096))
+COMPRESSED_VARIANT_TTL_SECONDS = float(os.getenv("COMPRESSED_VARIANT_TTL_SECONDS", 3600))
+
+# Catalog bodies only change on reseed, so each (ETag, encoding) pair is
+# compressed once and the result reused. Canonical entries (a theme, an
+# object, a named tour, the first themes page) are a small fixed set, which
+# makes maximum compression levels affordable for them: the cost is paid
+# once per catalog version.
+variant_cache = TTLCache(maxsize=COMPRESSED_VARIANT_CACHE_MAXSIZE, ttl=COMPRESSED_VARIANT_TTL_SECONDS)
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def encoding_weights(accept_encoding: Optional[str]) -> dict:
+    """
+    Parses Accept-Encoding into {encoding: q}. Unparseable q-values count
+    as 0, i.e. not acceptable.
+    """
+    weights = {}
+    if not accept_encoding:
+        return weights
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    return weights
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    weights = encoding_weights(accept_encoding)
+    return weights.get(encoding, weights.get("*", 0.0)) > 0
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the best encoding the client accepts, honouring q-values. Ties go
+    to brotli, which compresses JSON noticeably better than gzip.
+    """
+    weights = encoding_weights(accept_encoding)
+    best = None
+    best_q = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, dynamic: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=DYNAMIC_BROTLI_QUALITY if dynamic else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=DYNAMIC_GZIP_LEVEL if dynamic else GZIP_LEVEL, mtime=0)
+
+
+async def compress_async(body: bytes, encoding: str, dynamic: bool = False) -> bytes:
+    # Runs in a worker thread so a large body doesn't stall the event loop
+    return await asyncio.to_thread(compress, body, encoding, dynamic)
+
+
+async def compressed_variant(etag: str, body: bytes, encoding: str, dynamic: bool = False) -> bytes:
+    """
+    Returns `body` compressed with `encoding`, from the variant cache when
+    this ETag has been compressed before at the same kind of level.
+    """
+    key = (etag, encoding, dynamic)
+    variant = variant_cache.get(key)
+    if variant is None:
+        variant = await compress_async(body, encoding, dynamic)
+        variant_cache.set(key, variant)
+    return variant
+
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware for responses that don't negotiate their own encoding
+    (e.g. NDJSON exports). Starlette only checks that "gzip" appears in
+    Accept-Encoding, so "gzip;q=0" would still be gzipped; this honours
+    q-values the same way negotiate_encoding does.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not accepts_encoding(Headers(scope=scope).get("accept-encoding"), "gzip"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
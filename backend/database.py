@@ -1,25 +1,154 @@
+import asyncio
 import os
+import threading
 from pathlib import Path
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from dotenv import load_dotenv
+from metrics import command_metrics
 
 # Load .env from the same directory as this file
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 MONGODB_URI = os.getenv("MONGODB_URI")
-DB_NAME = "museum_tour" # Default name, or extract from URI if needed, but keeping it simple for now or relying on default db
+DB_NAME = os.getenv("MONGO_DB_NAME", "museum_tour")
+
+def _env_int(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+# Connection pool settings, per uvicorn worker. Unset values keep pymongo's defaults.
+MONGO_MAX_POOL_SIZE = _env_int("MONGO_MAX_POOL_SIZE", 100)
+MONGO_MIN_POOL_SIZE = _env_int("MONGO_MIN_POOL_SIZE", 0)
+MONGO_MAX_IDLE_TIME_MS = _env_int("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS")
+MONGO_CONNECT_TIMEOUT_MS = _env_int("MONGO_CONNECT_TIMEOUT_MS")
+MONGO_SOCKET_TIMEOUT_MS = _env_int("MONGO_SOCKET_TIMEOUT_MS")
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool utilization and checkout wait times from pymongo's
+    pool events. Events fire on the driver's threads, hence the lock.
+    """
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.pool_clears = 0
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_checked_out(self, event):
+        # duration was added in pymongo 4.7; older drivers don't report it
+        wait = getattr(event, "duration", None) or 0.0
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_pool_size": self.max_pool_size,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "utilization": round(self.checked_out / self.max_pool_size, 4) if self.max_pool_size else 0.0,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_checkout_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "pool_clears": self.pool_clears,
+            }
+
+def client_options() -> dict:
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+    }
+    return {key: value for key, value in options.items() if value is not None}
 
 class Database:
     client: AsyncIOMotorClient = None
+    pool_metrics: PoolMetricsListener = None
 
     def connect(self):
         if MONGODB_URI:
-            self.client = AsyncIOMotorClient(MONGODB_URI)
+            self.pool_metrics = PoolMetricsListener(MONGO_MAX_POOL_SIZE)
+            self.client = AsyncIOMotorClient(
+                MONGODB_URI,
+                event_listeners=[self.pool_metrics, command_metrics],
+                **client_options()
+            )
             print("Connected to MongoDB client")
         else:
             print("MONGODB_URI not set")
 
+    async def warm_up(self):
+        """
+        Opens minPoolSize connections up front by running that many pings
+        concurrently, so the first requests after a deploy don't pay for
+        connection setup (TCP, TLS and auth handshakes).
+        """
+        if not self.client or MONGO_MIN_POOL_SIZE <= 0:
+            return
+        await asyncio.gather(*[self.client.admin.command("ping") for _ in range(MONGO_MIN_POOL_SIZE)])
+        print(f"Warmed up {MONGO_MIN_POOL_SIZE} MongoDB connections")
+
+    def pool_stats(self):
+        if self.pool_metrics is None:
+            return None
+        return self.pool_metrics.stats()
+
     def close(self):
         if self.client:
             self.client.close()
@@ -33,4 +162,4 @@ class Database:
 db = Database()
 
 async def get_database():
-    return db.get_db()
\ No newline at end of file
+    return db.get_db()
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+from itertools import islice
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
+from dotenv import load_dotenv
+from security import get_password_hash
+from indexes import ensure_indexes
+from catalog import bump_catalog_version
+from locations import parse_location
+
+load_dotenv()
+
+MONGODB_URI = os.getenv("MONGODB_URI")
+
+# Building blocks for plausible titles and descriptions, so search and
+# payload sizes look like the hand-written catalog in seed.py
+ERAS = ["Bronze Age", "Roman", "Byzantine", "Medieval", "Ming Dynasty", "Edo Period", "Victorian", "Ottoman", "Aztec", "Sumerian", "Renaissance", "Art Deco"]
+MATERIALS = ["Bronze", "Marble", "Gold", "Silver", "Terracotta", "Ivory", "Jade", "Oak", "Silk", "Porcelain", "Iron", "Obsidian"]
+NOUNS = ["Sword", "Vase", "Helmet", "Statue", "Amulet", "Mask", "Shield", "Tablet", "Mirror", "Lamp", "Bowl", "Scroll", "Brooch", "Drum", "Tapestry", "Seal"]
+SUBJECTS = ["ritual", "warfare", "daily life", "trade", "royal power", "family", "the afterlife", "the harvest", "music", "craftsmanship"]
+TOUR_SIZES = "Small=3,Medium=5,Large=8"
+
+
+def parse_tour_sizes(value: str) -> list:
+    sizes = []
+    for part in value.split(","):
+        name, length = part.split("=")
+        sizes.append((name.strip(), int(length)))
+    return sizes
+
+
+def theme_id(index: int) -> str:
+    return f"syn-theme-{index:05d}"
+
+
+def object_id(index: int) -> str:
+    return f"syn-obj-{index:08d}"
+
+
+def generate_themes(rng: random.Random, count: int):
+    for i in range(count):
+        name = f"{rng.choice(ERAS)} {rng.choice(SUBJECTS).title()} {i}"
+        yield {
+            "_id": theme_id(i),
+            "id": theme_id(i),
+            "name": name,
+            "description": f"Synthetic theme exploring {rng.choice(SUBJECTS)} through {rng.choice(MATERIALS).lower()} artifacts.",
+            "image": f"https://placehold.co/800x600/gray/white?text={name.replace(' ', '+')}",
+        }
+
+
+def generate_objects(rng: random.Random, themes: int, per_theme: int):
+    """
+    Yields objects shaped like seed.generate_objects. Object n belongs to
+    theme n // per_theme, with a 20% chance of also belonging to a random
+    second theme, so tours and theme listings have overlap to deal with.
+    """
+    for n in range(themes * per_theme):
+        primary = n // per_theme
+        theme_ids = [theme_id(primary)]
+        if themes > 1 and rng.random() < 0.2:
+            secondary = rng.randrange(themes - 1)
+            theme_ids.append(theme_id(secondary if secondary < primary else secondary + 1))
+
+        title = f"{rng.choice(ERAS)} {rng.choice(MATERIALS)} {rng.choice(NOUNS)}"
+        subject = rng.choice(SUBJECTS)
+        obj = {
+            "_id": object_id(n),
+            "id": object_id(n),
+            "title": title,
+            "shortDescription": f"A {title.lower()} associated with {subject}.",
+            "contextualBackground": f"This {rng.choice(NOUNS).lower()} is a synthetic record #{n} used for load testing. "
+                                    f"It stands in for artifacts connected to {subject} and {rng.choice(SUBJECTS)}.",
+            "galleryLocation": f"Floor {rng.randint(1, 3)}, Room {rng.randint(100, 309)}",
+            "image": f"https://placehold.co/800x600/gray/white?text={title.replace(' ', '+')}",
+            "themeIds": theme_ids,
+            "mapPosition": {"top": f"{rng.randint(10, 80)}%", "left": f"{rng.randint(10, 80)}%"},
+        }
+        yield {**obj, "location": parse_location(obj)._asdict()}
+
+
+def generate_tours(rng: random.Random, themes: int, per_theme: int, sizes: list):
+    for t in range(themes):
+        first = t * per_theme
+        for size, length in sizes:
+            picks = rng.sample(range(first, first + per_theme), min(length, per_theme))
+            yield {
+                "_id": f"{theme_id(t)}:{size}",
+                "themeId": theme_id(t),
+                "size": size,
+                "objectIds": [object_id(n) for n in picks],
+            }
+
+
+def generate_users(count: int, password_hash: str):
+    # Every user shares one precomputed hash: hashing 1M passwords with
+    # bcrypt would take hours and isn't what the benchmark measures
+    for i in range(count):
+        yield {"_id": f"syn-user-{i:08d}", "email": f"user{i:08d}@example.com", "password_hash": password_hash}
+
+
+def batched(documents, size: int):
+    iterator = iter(documents)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def load(collection, documents, batch_size: int, in_flight: int) -> int:
+    """
+    Streams `documents` into `collection` with unordered insert_many batches,
+    keeping at most `in_flight` batches pending so memory stays bounded by
+    batch_size * in_flight documents regardless of the total. Documents that
+    already exist are skipped (duplicate key errors are counted, not fatal),
+    which makes re-running the generator with the same arguments a no-op.
+    """
+    inserted = 0
+    duplicates = 0
+    pending = set()
+
+    async def insert(batch):
+        nonlocal inserted, duplicates
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            existing = sum(1 for error in e.details["writeErrors"] if error["code"] == 11000)
+            inserted += e.details["nInserted"]
+            duplicates += existing
+            if existing < len(e.details["writeErrors"]):
+                raise
+
+    start = time.perf_counter()
+    for batch in batched(documents, batch_size):
+        if len(pending) >= in_flight:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        pending.add(asyncio.create_task(insert(batch)))
+    for task in asyncio.as_completed(pending):
+        await task
+
+    elapsed = time.perf_counter() - start
+    rate = inserted / elapsed if elapsed else 0
+    print(f"{collection.name}: {inserted} inserted, {duplicates} already present ({elapsed:.1f}s, {rate:,.0f} docs/s)")
+    return inserted
+
+
+async def generate(args):
+    client = AsyncIOMotorClient(MONGODB_URI)
+    db = client[args.db]
+    sizes = parse_tour_sizes(args.tour_sizes)
+
+    try:
+        if args.drop:
+            for name in ("themes", "objects", "tours", "users"):
+                await db[name].drop()
+            print(f"Dropped catalog and user collections in {args.db}")
+
+        # Same indexes the API creates at startup, built before loading so
+        # benchmarks measure indexed queries
+        await ensure_indexes(db)
+
+        # Separate streams per collection, so changing --users doesn't
+        # reshuffle the objects and vice versa
+        def rng(stream):
+            return random.Random(f"{args.seed}:{stream}")
+
+        await load(db.themes, generate_themes(rng("themes"), args.themes), args.batch_size, args.in_flight)
+        await load(db.objects, generate_objects(rng("objects"), args.themes, args.objects_per_theme), args.batch_size, args.in_flight)
+        await load(db.tours, generate_tours(rng("tours"), args.themes, args.objects_per_theme, sizes), args.batch_size, args.in_flight)
+        if args.users:
+            await load(db.users, generate_users(args.users, get_password_hash(args.password)), args.batch_size, args.in_flight)
+        await bump_catalog_version(db)
+
+        print("Synthetic catalog generated successfully!")
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a reproducible synthetic catalog into MongoDB for scale testing.")
+    parser.add_argument("--themes", type=int, default=100)
+    parser.add_argument("--objects-per-theme", type=int, default=1000)
+    parser.add_argument("--tour-sizes", default=TOUR_SIZES, help="Tours created per theme, as name=length pairs (default: %(default)s)")
+    parser.add_argument("--users", type=int, default=0)
+    parser.add_argument("--password", default="password123", help="Password shared by every generated user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--in-flight", type=int, default=4, help="Concurrent insert_many batches")
+    parser.add_argument("--db", default="museum_tour_synthetic", help="Target database (default: %(default)s)")
+    parser.add_argument("--drop", action="store_true", help="Drop the target collections first")
+    args = parser.parse_args()
+
+    if not MONGODB_URI:
+        print("Error: MONGODB_URI not found in environment variables.")
+        exit(1)
+    asyncio.run(generate(args))
+
+
+if __name__ == "__main__":
+    main()
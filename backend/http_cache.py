@@ -0,0 +1,108 @@
+import hashlib
+import os
+from typing import Any, NamedTuple, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from compression import COMPRESSION_MIN_SIZE, compress_async, compressed_variant, negotiate_encoding
+
+CATALOG_CACHE_CONTROL = os.getenv(
+    "CATALOG_CACHE_CONTROL", "public, max-age=60, stale-while-revalidate=300"
+)
+
+
+class CatalogEntry(NamedTuple):
+    body: bytes
+    etag: str
+    # Precompressed representations by encoding, when the entry comes with
+    # its own (see shared_catalog.py); otherwise compressed on demand
+    variants: Optional[dict] = None
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Strong ETag derived from the serialized document, so it only changes when
+    the catalog data itself changes (i.e. after a reseed).
+    """
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def build_entry(payload: Any) -> CatalogEntry:
+    """
+    Encodes an already validated payload once; the bytes are then served
+    as-is for every request until the entry is evicted.
+    """
+    body = orjson.dumps(payload)
+    return CatalogEntry(body=body, etag=compute_etag(body))
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    # Each encoded representation gets its own validator, e.g. "abc123-br"
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+
+
+def is_not_modified(request: Request, entry: CatalogEntry) -> bool:
+    """
+    Weak comparison of If-None-Match against the entry's ETag, as RFC 9110
+    requires for GET/HEAD. Validators of any compressed variant of the entry
+    match too, since they share the same underlying content.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    variant_prefix = entry.etag[:-1] + "-"
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == entry.etag or candidate.startswith(variant_prefix):
+            return True
+    return False
+
+
+async def entry_response(request: Request, entry: CatalogEntry, cached: bool = True, canonical: bool = False) -> Response:
+    """
+    Answers If-None-Match from the entry's ETag, or sends the pre-serialized
+    body directly, bypassing response_model validation and JSON encoding.
+    Bodies above COMPRESSION_MIN_SIZE are sent in the best encoding the
+    client accepts, using the entry's own variant or the precompressed
+    variant for this ETag. Only canonical entries are compressed at maximum
+    levels; the rest use fast levels, since clients can make new ones at
+    will. Pass cached=False for bodies built for a single request: they're
+    not kept, so they can't evict catalog variants.
+    """
+    compressible = len(entry.body) >= COMPRESSION_MIN_SIZE
+    encoding = None
+    if compressible:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+
+    variant = entry.variants.get(encoding) if encoding is not None and entry.variants else None
+    if variant is not None:
+        etag = variant.etag
+    else:
+        etag = entry.etag if encoding is None else variant_etag(entry.etag, encoding)
+    headers = cache_headers(etag)
+    if is_not_modified(request, entry):
+        if compressible:
+            headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        # GZipMiddleware adds Vary itself to large uncompressed bodies
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    headers["Content-Encoding"] = encoding
+    headers["Vary"] = "Accept-Encoding"
+    if variant is not None:
+        body = variant.body
+    elif cached:
+        body = await compressed_variant(entry.etag, entry.body, encoding, dynamic=not canonical)
+    else:
+        body = await compress_async(entry.body, encoding, dynamic=True)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import requests
+
+PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
+# Point this at a local stub server in tests
+PEXELS_BASE_URL = os.getenv("PEXELS_BASE_URL", "https://api.pexels.com/v1")
+PEXELS_RATE_PER_SECOND = float(os.getenv("PEXELS_RATE_PER_SECOND", 3))
+PEXELS_BURST = int(os.getenv("PEXELS_BURST", 5))
+PEXELS_CONCURRENCY = int(os.getenv("PEXELS_CONCURRENCY", 8))
+PEXELS_MAX_RETRIES = int(os.getenv("PEXELS_MAX_RETRIES", 4))
+PEXELS_BACKOFF_SECONDS = float(os.getenv("PEXELS_BACKOFF_SECONDS", 0.5))
+IMAGE_CACHE_PATH = os.getenv("IMAGE_CACHE_PATH", str(Path(__file__).parent / ".image_cache.json"))
+
+
+def placeholder_image(query: str) -> str:
+    return f"https://placehold.co/800x600/gray/white?text={query.replace(' ', '+')}"
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows `burst` requests immediately, then `rate` per
+    second on average. Waiters sleep instead of spinning.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ImageResolver:
+    """
+    Resolves image search queries to Pexels photo URLs concurrently.
+
+    Requests are rate limited with a token bucket, retried with exponential
+    backoff (honouring Retry-After on 429) and remembered in an on-disk JSON
+    cache, so re-seeding only calls the API for titles it hasn't seen.
+    Queries that can't be resolved fall back to a placeholder image and are
+    not cached, so a later run can still fill them in.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = PEXELS_API_KEY,
+        base_url: str = PEXELS_BASE_URL,
+        cache_path: Optional[str] = IMAGE_CACHE_PATH,
+        rate: float = PEXELS_RATE_PER_SECOND,
+        burst: int = PEXELS_BURST,
+        concurrency: int = PEXELS_CONCURRENCY,
+        max_retries: int = PEXELS_MAX_RETRIES,
+        backoff: float = PEXELS_BACKOFF_SECONDS,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.api_calls = 0
+        self.cache = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, str]:
+        if self.cache_path and self.cache_path.exists():
+            try:
+                return json.loads(self.cache_path.read_text())
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable image cache {self.cache_path}: {e}")
+        return {}
+
+    def save(self):
+        if not self.cache_path:
+            return
+        # Write-then-rename so an interrupted seed never leaves a corrupt cache
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.cache, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.cache_path)
+
+    def _search(self, query: str):
+        response = requests.get(
+            f"{self.base_url}/search",
+            params={"query": query, "per_page": 1},
+            headers={"Authorization": self.api_key},
+            timeout=10,
+        )
+        return response
+
+    async def _fetch(self, query: str) -> Optional[str]:
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() / 2)
+            try:
+                self.api_calls += 1
+                response = await asyncio.to_thread(self._search, query)
+                if response.status_code == 200:
+                    photos = response.json().get("photos")
+                    return photos[0]["src"]["large"] if photos else None
+                if response.status_code == 429 or response.status_code >= 500:
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, float(retry_after))
+                    print(f"Pexels returned {response.status_code} for '{query}', retrying in {delay:.1f}s")
+                else:
+                    print(f"Pexels returned {response.status_code} for '{query}'")
+                    return None
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"Error fetching image for '{query}': {e}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+        return None
+
+    async def resolve(self, query: str) -> str:
+        if query in self.cache:
+            return self.cache[query]
+        if not self.api_key:
+            return placeholder_image(query)
+
+        url = await self._fetch(query)
+        if url is None:
+            return placeholder_image(query)
+        self.cache[query] = url
+        return url
+
+    async def resolve_many(self, queries: Iterable[str]) -> Dict[str, str]:
+        unique = list(dict.fromkeys(queries))
+        if not self.api_key and any(query not in self.cache for query in unique):
+            print("Warning: PEXELS_API_KEY not set. Using placeholder images.")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(query):
+            async with semaphore:
+                return query, await self.resolve(query)
+
+        results = dict(await asyncio.gather(*[bounded(query) for query in unique]))
+        self.save()
+        return results
@@ -0,0 +1,103 @@
+from typing import NamedTuple
+from pymongo.errors import PyMongoError
+
+
+# Emails compare case-insensitively (strength 2 ignores case, not accents).
+# Queries must pass the same collation to use users_email_unique_ci.
+EMAIL_COLLATION = {"locale": "en", "strength": 2}
+USERS_EMAIL_INDEX = "users_email_unique_ci"
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: list
+    options: dict
+
+
+# Every index the API relies on. Applied at startup (see main.lifespan) and
+# checked by verify_indexes.py; add new hot queries here, not ad hoc.
+INDEXES = [
+    # login, signup and get_current_user all look users up by email; the
+    # unique constraint is what keeps signups race-free (see main.signup)
+    IndexSpec("users", [("email", 1)], {"name": USERS_EMAIL_INDEX, "unique": True, "collation": EMAIL_COLLATION}),
+    # get_tour_objects matches on (themeId, size)
+    IndexSpec("tours", [("themeId", 1), ("size", 1)], {"name": "tours_theme_size"}),
+    # /themes/{id}/objects filters on themeIds and pages by _id
+    IndexSpec("objects", [("themeIds", 1), ("_id", 1)], {"name": "objects_themeIds"}),
+]
+
+class HotQuery(NamedTuple):
+    name: str
+    collection: str
+    filter: dict
+    sort: dict
+    collation: dict = None
+
+
+# Representative shapes of the queries served on every request. Values don't
+# need to exist; only the plan the server picks matters.
+HOT_QUERIES = [
+    HotQuery("login/signup user lookup", "users", {"email": "someone@example.com"}, None, EMAIL_COLLATION),
+    HotQuery("tour configuration", "tours", {"themeId": "roman-empire", "size": "Small"}, None),
+    HotQuery("theme objects listing", "objects", {"themeIds": "roman-empire"}, {"_id": 1}),
+    HotQuery("object by id", "objects", {"_id": "obj-001"}, None),
+    HotQuery("bulk objects", "objects", {"_id": {"$in": ["obj-001", "obj-002"]}}, None),
+]
+
+
+async def ensure_indexes(database) -> list:
+    """
+    Creates every index in INDEXES. create_index is a no-op for indexes that
+    already exist, so this is safe to run on every startup. Failures (e.g. a
+    unique index over existing duplicates) are reported and skipped rather
+    than preventing the API from starting.
+    """
+    created = []
+    for spec in INDEXES:
+        try:
+            name = await database[spec.collection].create_index(spec.keys, **spec.options)
+            created.append(f"{spec.collection}.{name}")
+        except PyMongoError as e:
+            print(f"Failed to create index {spec.options.get('name')} on {spec.collection}: {e}")
+    return created
+
+
+_existing_indexes = set()
+
+
+async def index_exists(database, collection: str, name: str) -> bool:
+    """
+    Whether `collection` has the index `name`. Found indexes are
+    remembered; a missing one is looked up again on the next call, so an
+    index built after startup is picked up without a restart.
+    """
+    key = (database.name, collection, name)
+    if key in _existing_indexes:
+        return True
+    if name not in await database[collection].index_information():
+        return False
+    _existing_indexes.add(key)
+    return True
+
+
+def plan_stages(plan: dict) -> list:
+    """
+    Flattens an explain() plan tree into the list of its stage names.
+    """
+    stages = [plan.get("stage")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
+
+
+async def explain_query(database, query: HotQuery) -> list:
+    command = {"find": query.collection, "filter": query.filter}
+    if query.sort:
+        command["sort"] = query.sort
+    if query.collation:
+        command["collation"] = query.collation
+    result = await database.command({"explain": command, "verbosity": "queryPlanner"})
+    return plan_stages(result["queryPlanner"]["winningPlan"])
@@ -0,0 +1,358 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_PORT = 8002
+LOADTEST_EMAIL = "loadtest@example.com"
+LOADTEST_PASSWORD = "loadtest-password"
+
+# Relative weight of each endpoint in the request mix
+DEFAULT_MIX = "themes=30,object=35,tour=25,login=2,me=8"
+TOUR_SIZES = ["Small", "Medium", "Large"]
+
+
+class Connection:
+    """
+    Minimal HTTP/1.1 keep-alive client on asyncio streams. Enough for the
+    JSON endpoints under test (Content-Length or chunked bodies), without
+    pulling an HTTP client library into requirements.txt.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, headers: dict = None, body: bytes = b""):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while size := int((await self.reader.readline()).strip(), 16):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            await self.reader.readline()
+            payload = b"".join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, weight = part.split("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def json_body(payload: dict):
+    return {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+# Each endpoint builds (method, path, headers, body) from the shared fixtures
+def themes_request(fixtures, rng):
+    return "GET", "/api/v1/themes", {}, b""
+
+
+def object_request(fixtures, rng):
+    return "GET", f"/api/v1/objects/{rng.choice(fixtures['object_ids'])}", {}, b""
+
+
+def tour_request(fixtures, rng):
+    return "GET", f"/api/v1/tours/{rng.choice(fixtures['theme_ids'])}/{rng.choice(TOUR_SIZES)}", {}, b""
+
+
+def login_request(fixtures, rng):
+    headers, body = json_body({"email": LOADTEST_EMAIL, "password": LOADTEST_PASSWORD})
+    return "POST", "/api/v1/auth/login", headers, body
+
+
+def me_request(fixtures, rng):
+    return "GET", "/api/v1/users/me", {"Authorization": f"Bearer {fixtures['token']}"}, b""
+
+
+ENDPOINTS = {
+    "themes": themes_request,
+    "object": object_request,
+    "tour": tour_request,
+    "login": login_request,
+    "me": me_request,
+}
+
+
+async def prepare_fixtures(host: str, port: int) -> dict:
+    """
+    Collects real theme and object ids to request, and a user plus token for
+    the auth endpoints (signing the user up if needed).
+    """
+    conn = Connection(host, port)
+    try:
+        status, payload = await conn.request("GET", "/api/v1/themes?limit=1000")
+        if status != 200:
+            raise RuntimeError(f"GET /api/v1/themes returned {status}")
+        theme_ids = [theme["id"] for theme in json.loads(payload)]
+        if not theme_ids:
+            raise RuntimeError("No themes in the database; run seed.py first")
+
+        object_ids = []
+        for theme_id in theme_ids[:20]:
+            status, payload = await conn.request("GET", f"/api/v1/themes/{theme_id}/objects?view=summary&limit=100")
+            if status == 200:
+                object_ids += [obj["id"] for obj in json.loads(payload)]
+
+        headers, body = json_body({"email": LOADTEST_EMAIL, "password": LOADTEST_PASSWORD})
+        await conn.request("POST", "/api/v1/auth/signup", headers, body)
+        status, payload = await conn.request("POST", "/api/v1/auth/login", headers, body)
+        if status != 200:
+            raise RuntimeError(f"Login for {LOADTEST_EMAIL} returned {status}")
+        token = json.loads(payload)["access_token"]
+    finally:
+        conn.close()
+
+    return {"theme_ids": theme_ids, "object_ids": object_ids or ["obj-001"], "token": token}
+
+
+async def worker(host, port, fixtures, mix, deadline, rng, results):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    conn = Connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, headers, body = ENDPOINTS[name](fixtures, rng)
+            stats = results[name]
+            start = time.perf_counter()
+            try:
+                status, _ = await conn.request(method, path, headers, body)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                stats["errors"] += 1
+                conn.close()
+                continue
+            stats["latencies"].append(time.perf_counter() - start)
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+    finally:
+        conn.close()
+
+
+def summarize(results: dict, elapsed: float) -> dict:
+    def describe(latencies, statuses, errors):
+        latencies = sorted(latencies)
+        failures = errors + sum(count for status, count in statuses.items() if status >= 400)
+        return {
+            "requests": len(latencies) + errors,
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            "failures": failures,
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        }
+
+    endpoints = {name: describe(**stats) for name, stats in results.items()}
+    all_statuses = {}
+    for stats in results.values():
+        for status, count in stats["statuses"].items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+    overall = describe(
+        [latency for stats in results.values() for latency in stats["latencies"]],
+        all_statuses,
+        sum(stats["errors"] for stats in results.values()),
+    )
+    return {"overall": overall, "endpoints": endpoints}
+
+
+async def run_load(host, port, concurrency, duration, mix, seed, warmup):
+    fixtures = await prepare_fixtures(host, port)
+
+    async def phase(seconds):
+        results = {name: {"latencies": [], "statuses": {}, "errors": 0} for name in mix}
+        deadline = time.perf_counter() + seconds
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            worker(host, port, fixtures, mix, deadline, random.Random(seed + i), results)
+            for i in range(concurrency)
+        ])
+        return results, time.perf_counter() - start
+
+    if warmup > 0:
+        print(f"Warming up for {warmup}s...")
+        await phase(warmup)
+
+    print(f"Running {concurrency} connections for {duration}s...")
+    results, elapsed = await phase(duration)
+    return summarize(results, elapsed)
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns regressions against a baseline: any endpoint whose p95/p99 grew
+    or whose throughput dropped by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for name, current in {"overall": summary["overall"], **summary["endpoints"]}.items():
+        previous = baseline["overall"] if name == "overall" else baseline["endpoints"].get(name)
+        if not previous:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if previous[key] and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{name} {key}: {previous[key]} -> {current[key]}")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name} throughput_rps: {previous['throughput_rps']} -> {current['throughput_rps']}")
+    return regressions
+
+
+def print_report(summary: dict):
+    print(f"\n{'endpoint':<10} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'failures':>9}")
+    for name, stats in {**summary["endpoints"], "overall": summary["overall"]}.items():
+        print(f"{name:<10} {stats['requests']:>9} {stats['throughput_rps']:>9} {stats['p50_ms']:>9} "
+              f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['failures']:>9}")
+
+
+def read_stream(stream, prefix):
+    for line in iter(stream.readline, ''):
+        print(f"[{prefix}] {line.strip()}")
+    stream.close()
+
+
+def start_server(port: int, workers: int):
+    """
+    Starts uvicorn the way verify_changes.py does, then waits for /healthz.
+    All simulated users share one IP and one account, so the per-client auth
+    rate limits are lifted unless set explicitly; admission control stays on.
+    """
+    env = os.environ.copy()
+    for name in ("AUTH_IP_RATE_PER_MINUTE", "AUTH_EMAIL_RATE_PER_MINUTE", "AUTH_IP_BURST", "AUTH_EMAIL_BURST"):
+        env.setdefault(name, "1000000")
+    print(f"Starting backend server on port {port}...")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(BACKEND_DIR),
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--no-access-log"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        text=True,
+        bufsize=1
+    )
+    for stream, prefix in ((process.stdout, "SERVER_OUT"), (process.stderr, "SERVER_ERR")):
+        threading.Thread(target=read_stream, args=(stream, prefix), daemon=True).start()
+
+    async def wait_ready():
+        for _ in range(100):
+            if process.poll() is not None:
+                return False
+            try:
+                status, _ = await Connection("127.0.0.1", port).request("GET", "/healthz", {"Connection": "close"})
+                if status == 200:
+                    return True
+            except OSError:
+                pass
+            await asyncio.sleep(0.1)
+        return False
+
+    if not asyncio.run(wait_ready()):
+        process.terminate()
+        print("Server failed to start.")
+        sys.exit(1)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the museum tour API.")
+    parser.add_argument("--url", help="Test an already running server instead of starting one, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port for the server started by this script")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the server started by this script")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest_results.json", help="Where to save this run's results")
+    parser.add_argument("--baseline", help="Results JSON to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression vs. baseline (default: %(default)s)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    process = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        process = start_server(port, args.workers)
+
+    try:
+        summary = asyncio.run(run_load(host, port, args.concurrency, args.duration, mix, args.seed, args.warmup))
+    finally:
+        if process is not None:
+            print("Shutting down server...")
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    summary["config"] = {
+        "concurrency": args.concurrency, "duration": args.duration, "mix": mix,
+        "workers": args.workers, "seed": args.seed,
+    }
+    print_report(summary)
+    Path(args.output).write_text(json.dumps(summary, indent=2))
+    print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        regressions = compare(summary, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS vs {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
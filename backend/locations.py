@@ -0,0 +1,61 @@
+import re
+from typing import NamedTuple, Optional
+
+# "Floor 2, Room 214" as written in galleryLocation
+_GALLERY_LOCATION_RE = re.compile(r"floor\s*(\d+)\D+?room\s*(\d+)", re.IGNORECASE)
+
+
+class Location(NamedTuple):
+    """
+    Where an object sits: its floor and room, and its position on that
+    floor's map as percentages of the map's width (x) and height (y).
+    """
+    floor: int
+    room: int
+    x: float
+    y: float
+
+
+def parse_gallery_location(text: str):
+    """
+    Returns (floor, room) from a "Floor N, Room R" string, or None if the
+    text doesn't follow that format.
+    """
+    match = _GALLERY_LOCATION_RE.search(text or "")
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_percent(value) -> Optional[float]:
+    """
+    Parses a mapPosition coordinate ("37%", "37.5%" or a bare number).
+    """
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def parse_location(obj: dict) -> Location:
+    """
+    Parses an object document's galleryLocation and mapPosition. Unparseable
+    parts fall back to floor 1, room 0 and the centre of the map, so one bad
+    record can't break a tour or the map.
+    """
+    floor, room = parse_gallery_location(obj.get("galleryLocation")) or (1, 0)
+    position = obj.get("mapPosition") or {}
+    x = parse_percent(position.get("left"))
+    y = parse_percent(position.get("top"))
+    return Location(floor, room, 50.0 if x is None else x, 50.0 if y is None else y)
+
+
+def object_location(obj: dict) -> Location:
+    """
+    Returns an object's normalized `location` when stored (seed.py writes
+    it), otherwise parses it from the raw fields.
+    """
+    stored = obj.get("location")
+    if stored:
+        return Location(stored["floor"], stored["room"], stored["x"], stored["y"])
+    return parse_location(obj)
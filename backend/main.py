@@ -1,22 +1,71 @@
 import os
-from typing import List
+from typing import List, Optional
+import orjson
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
-from models import UserCreate, UserResponse, UserLogin, Token, MuseumTheme, MuseumObject
-from security import get_password_hash, verify_password, create_access_token, get_current_user
+from pymongo.errors import DuplicateKeyError
+from models import UserCreate, UserResponse, UserLogin, Token, MuseumTheme, MuseumObject, ObjectBatch, SearchResults, NearbyObject
+from security import get_password_hash_async, verify_password_async, create_access_token, get_current_user, password_pool, token_cache
 from database import db
+from cache import catalog_cache, catalog_flights, page_cache
+from catalog import (
+    plan_tour, to_public, order_by_ids, fetch_page, keyset_filter, stream_ndjson,
+    parse_fields, partial_model, mongo_projection, iterate,
+)
+from http_cache import CatalogEntry, build_entry, compute_etag, entry_response
+from compression import COMPRESSION_MIN_SIZE, NegotiatedGZipMiddleware, variant_cache
+from indexes import EMAIL_COLLATION, USERS_EMAIL_INDEX, ensure_indexes, index_exists
+from metrics import MetricsMiddleware, registry
+from search import catalog_search
+from spatial import nearby_index
+from admission import admit_auth, admission_stats, auth_limiters, ip_limiter, email_limiter
+from snapshot import catalog_snapshot
+from shared_catalog import shared_catalog
 
 load_dotenv()
 
+OBJECTS_BATCH_MAX = int(os.getenv("OBJECTS_BATCH_MAX", 100))
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", 100))
+CATALOG_PAGE_MAX = int(os.getenv("CATALOG_PAGE_MAX", 1000))
+NDJSON_BATCH_SIZE = int(os.getenv("NDJSON_BATCH_SIZE", 500))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+TOUR_SIZE_MAX = int(os.getenv("TOUR_SIZE_MAX", 50))
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", 20))
+SEARCH_PAGE_MAX = int(os.getenv("SEARCH_PAGE_MAX", 100))
+SEARCH_QUERY_MAX_LENGTH = 200
+NEARBY_RADIUS_DEFAULT = float(os.getenv("NEARBY_RADIUS_DEFAULT", 15))
+NEARBY_LIMIT_MAX = int(os.getenv("NEARBY_LIMIT_MAX", 200))
+
+FIELDS_DESCRIPTION = "Comma-separated MuseumObject fields to return (id is always included)"
+VIEW_DESCRIPTION = "Named field set: 'summary' or 'full'"
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Connect to MongoDB
     db.connect()
+    database = db.get_db()
+    if database is not None:
+        try:
+            await db.warm_up()
+        except Exception as e:
+            print(f"Connection pool warm-up failed: {e}")
+        try:
+            created = await ensure_indexes(database)
+            print(f"Ensured indexes: {', '.join(created)}")
+            if f"users.{USERS_EMAIL_INDEX}" not in created:
+                print(f"WARNING: users.{USERS_EMAIL_INDEX} is missing; signups are refused until it exists")
+        except Exception as e:
+            print(f"Index setup skipped: {e}")
+    # Loaded even without MongoDB, so the catalog can still be served
+    await catalog_snapshot.refresh(database)
+    await shared_catalog.refresh(database)
     yield
     # Shutdown: Close connection
     db.close()
+    password_pool.shutdown()
 
 app = FastAPI(title="Museum Thematic Tour Backend", lifespan=lifespan)
 
@@ -35,6 +84,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Catalog responses carry their own precompressed variants (see
+# http_cache.entry_response); this compresses everything else, such as
+# NDJSON exports. Responses that already have a Content-Encoding are skipped.
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+# Outermost, so timings include compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
+def collect_runtime_gauges():
+    gauges = []
+    for name, cache in (("catalog_cache", catalog_cache), ("page_cache", page_cache), ("token_cache", token_cache), ("compressed_variants", variant_cache)):
+        gauges.append((f"{name}_hits", f"Lookups served by the {name}.", cache.hits))
+        gauges.append((f"{name}_misses", f"Lookups that missed the {name}.", cache.misses))
+        gauges.append((f"{name}_size", f"Entries currently held in the {name}.", len(cache)))
+    gauges.append(("catalog_coalesced_requests", "Catalog reads that joined an identical load already in flight.", catalog_flights.coalesced))
+    gauges.append(("catalog_loads_in_flight", "Catalog loads currently running.", len(catalog_flights)))
+    for route, limiter in auth_limiters.items():
+        gauges.append((f"auth_{route}_shed", f"{route} requests shed by admission control.", limiter.shed))
+        gauges.append((f"auth_{route}_waiting", f"{route} requests waiting for an admission slot.", limiter.waiting))
+    gauges.append(("auth_rate_limited_by_ip", "Auth requests rejected by the per-IP rate limit.", ip_limiter.limited))
+    gauges.append(("auth_rate_limited_by_email", "Auth requests rejected by the per-email rate limit.", email_limiter.limited))
+    gauges.append(("password_pool_queue_depth", "Password operations waiting for a bcrypt worker.", password_pool.queued))
+    gauges.append(("password_pool_running", "Password operations currently running.", password_pool.running))
+    pool = db.pool_stats()
+    if pool is not None:
+        gauges.append(("mongodb_pool_checked_out", "MongoDB connections currently checked out.", pool["checked_out"]))
+        gauges.append(("mongodb_pool_open_connections", "Open MongoDB connections.", pool["open_connections"]))
+        gauges.append(("mongodb_pool_utilization", "Checked-out connections as a fraction of maxPoolSize.", pool["utilization"]))
+    return gauges
+
+registry.add_collector(collect_runtime_gauges)
+
 @app.get("/healthz")
 async def health_check():
     """
@@ -50,42 +131,141 @@ async def health_check():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
+@app.get("/stats")
+async def stats():
+    """
+    Returns in-process counters for the MongoDB connection pool, the catalog,
+    page, compressed-variant and token caches, coalesced catalog loads, the
+    password hashing pool, auth admission control, the search and spatial indexes and the catalog
+    snapshot and shared file.
+    """
+    return {
+        "mongo_pool": db.pool_stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "page_cache": page_cache.stats(),
+        "catalog_flights": catalog_flights.stats(),
+        "compressed_variants": variant_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "auth_admission": admission_stats(),
+        "search_index": catalog_search.stats(),
+        "spatial_index": nearby_index.stats(),
+        "catalog_snapshot": catalog_snapshot.stats(),
+        "shared_catalog": shared_catalog.stats(),
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text exposition of request, MongoDB and bcrypt metrics.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+async def read_through(key, loader, model):
+    """
+    Serves a catalog read from the in-process cache, falling back to the
+    loader (a MongoDB query) on a miss. Documents are validated against
+    `model` once when loaded, and cached as CatalogEntry tuples carrying the
+    serialized JSON body and its precomputed ETag. Missing documents
+    are not cached so a fresh seed is picked up without waiting for a 404 to
+    expire.
+
+    Entries in the shared catalog file (see shared_catalog.py) are served
+    straight from the memory map, compressed variants included, and never
+    copied into the cache.
+    Concurrent misses for the same key share a single load (see
+    cache.SingleFlight).
+    """
+    shared = await shared_catalog.get(db.get_db())
+    if shared is not None:
+        entry = shared.get(key)
+        if entry is not None:
+            return entry
+
+    entry = catalog_cache.get(key)
+    if entry is not None:
+        return entry
+
+    async def load():
+        value = await loader()
+        if value is None:
+            return None
+        entry = build_entry(to_public(model, value))
+        catalog_cache.set(key, entry)
+        return entry
+
+    return await catalog_flights.do(key, load)
+
+async def catalog_sources():
+    """
+    Returns (database, snapshot) for a catalog read. While a current
+    snapshot is loaded (see snapshot.py) reads are served from it, so
+    MongoDB is only required without one.
+    """
+    database = db.get_db()
+    snapshot = await catalog_snapshot.get(database)
+    if database is None and snapshot is None:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    return database, snapshot
+
+async def find_theme(database, snapshot, theme_id: str):
+    if snapshot is not None:
+        return snapshot.theme(theme_id)
+    return await database.themes.find_one({"_id": theme_id})
+
+async def find_object(database, snapshot, object_id: str, projection=None):
+    if snapshot is not None:
+        return snapshot.object(object_id)
+    return await database.objects.find_one({"_id": object_id}, projection)
+
 @app.post("/api/v1/auth/signup", response_model=UserResponse, status_code=201)
-async def signup(user: UserCreate):
+async def signup(user: UserCreate, request: Request):
     database = db.get_db()
     if database is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
-    
-    # Check if user already exists
-    if await database.users.find_one({"email": user.email}):
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    # Create new user
-    user_dict = {
-        "email": user.email,
-        "password_hash": get_password_hash(user.password)
-    }
-    
-    result = await database.users.insert_one(user_dict)
-    
+
+    async with admit_auth(request, "signup", user.email):
+        # Without the unique index concurrent signups could create duplicates
+        if not await index_exists(database, "users", USERS_EMAIL_INDEX):
+            raise HTTPException(
+                status_code=503,
+                detail="Signups are unavailable, please retry later",
+                headers={"Retry-After": "60"},
+            )
+
+        user_dict = {
+            "email": user.email,
+            "password_hash": await get_password_hash_async(user.password)
+        }
+
+        # The case-insensitive unique index on users.email (see indexes.py)
+        # rejects an existing address in the same round-trip, even when two
+        # signups race
+        try:
+            result = await database.users.insert_one(user_dict)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email already registered")
+
     return UserResponse(id=str(result.inserted_id), email=user.email)
 
 @app.post("/api/v1/auth/login", response_model=Token)
-async def login(user_login: UserLogin):
+async def login(user_login: UserLogin, request: Request):
     database = db.get_db()
     if database is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
 
-    user = await database.users.find_one({"email": user_login.email})
-    if not user or not verify_password(user_login.password, user["password_hash"]):
-        raise HTTPException(
-            status_code=401,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    async with admit_auth(request, "login", user_login.email):
+        user = await database.users.find_one({"email": user_login.email}, collation=EMAIL_COLLATION)
+        if not user or not await verify_password_async(user_login.password, user["password_hash"]):
+            raise HTTPException(
+                status_code=401,
+                detail="Incorrect email or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
     
     access_token = create_access_token(
-        subject=user["email"]
+        subject=user["email"],
+        user_id=str(user["_id"])
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -93,70 +273,259 @@ async def login(user_login: UserLogin):
 async def read_users_me(current_user: dict = Depends(get_current_user)):
     return UserResponse(id=str(current_user["_id"]), email=current_user["email"])
 
+def object_fields(fields: Optional[str], view: Optional[str]):
+    """
+    Validates ?fields= / ?view= against MuseumObject. Returns the selected
+    field names, or None for the full document.
+    """
+    try:
+        return parse_fields(MuseumObject, fields, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def projected_key(key: tuple, fields) -> tuple:
+    # Full documents keep the plain key so every path shares those entries
+    return key if fields is None else key + (fields,)
+
+async def list_catalog(request: Request, key, collection, base: dict, model, after: Optional[str], limit: Optional[int], fields=None, listing=None):
+    """
+    Shared implementation of the catalog listings.
+
+    By default returns one keyset page as a JSON array (the default first
+    page from the catalog cache, other pages from the smaller page cache),
+    with the next page's cursor in the X-Next-Cursor and Link headers.
+    Clients sending `Accept: application/x-ndjson` instead get the listing
+    streamed line by line from the Motor cursor; without a limit that is everything after the
+    cursor, which is how the full catalog is exported. `fields` narrows the
+    documents to a projection of `model`. With a snapshot `listing` the
+    pages come from memory instead of `collection`.
+    """
+    projection = mongo_projection(model, fields)
+    model = partial_model(model, fields)
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        if listing is not None:
+            return StreamingResponse(stream_ndjson(iterate(listing.scan(after, limit)), model), media_type=NDJSON_MEDIA_TYPE)
+        cursor = collection.find(keyset_filter(base, after), projection).sort("_id", 1).batch_size(NDJSON_BATCH_SIZE)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return StreamingResponse(stream_ndjson(cursor, model), media_type=NDJSON_MEDIA_TYPE)
+
+    limit = limit or CATALOG_PAGE_SIZE
+    page_key = projected_key(key, fields) + (after, limit)
+    # Only the default first page shares the catalog cache (see page_cache)
+    first_page = after is None and limit == CATALOG_PAGE_SIZE
+    cache = catalog_cache if first_page and fields is None else page_cache
+    async def load_page():
+        if listing is not None:
+            docs, next_cursor = listing.page(after, limit)
+        else:
+            docs, next_cursor = await fetch_page(collection, base, after, limit, projection)
+        page = (build_entry(to_public(model, docs)), next_cursor)
+        cache.set(page_key, page)
+        return page
+
+    page = cache.get(page_key)
+    if page is None:
+        page = await catalog_flights.do(page_key, load_page)
+
+    entry, next_cursor = page
+    # Only the default first themes page is canonical; other pages are
+    # keyed by client-chosen cursors and limits
+    canonical = key == ("themes",) and first_page
+    response = await entry_response(request, entry, canonical=canonical)
+    if next_cursor is not None:
+        next_url = request.url.include_query_params(after=next_cursor, limit=limit)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
 @app.get("/api/v1/themes", response_model=List[MuseumTheme], response_model_by_alias=False)
-async def get_themes():
-    database = db.get_db()
-    if database is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
+async def get_themes(
+    request: Request,
+    after: Optional[str] = Query(None, description="Cursor: id of the last theme already seen"),
+    limit: Optional[int] = Query(None, ge=1, le=CATALOG_PAGE_MAX),
+):
+    database, snapshot = await catalog_sources()
     
-    themes = await database.themes.find().to_list(length=100)
-    return themes
+    return await list_catalog(
+        request, ("themes",), None if database is None else database.themes, {}, MuseumTheme, after, limit,
+        listing=None if snapshot is None else snapshot.theme_listing
+    )
 
 @app.get("/api/v1/themes/{theme_id}", response_model=MuseumTheme, response_model_by_alias=False)
-async def get_theme(theme_id: str):
-    database = db.get_db()
-    if database is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
+async def get_theme(theme_id: str, request: Request):
+    database, snapshot = await catalog_sources()
     
-    theme = await database.themes.find_one({"_id": theme_id})
+    theme = await read_through(
+        ("theme", theme_id),
+        lambda: find_theme(database, snapshot, theme_id),
+        MuseumTheme
+    )
     if theme is None:
         raise HTTPException(status_code=404, detail="Theme not found")
     
-    return theme
+    return await entry_response(request, theme, canonical=True)
+
+@app.get("/api/v1/themes/{theme_id}/objects", response_model=List[MuseumObject], response_model_by_alias=False)
+async def get_theme_objects(
+    theme_id: str,
+    request: Request,
+    after: Optional[str] = Query(None, description="Cursor: id of the last object already seen"),
+    limit: Optional[int] = Query(None, ge=1, le=CATALOG_PAGE_MAX),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    view: Optional[str] = Query(None, description=VIEW_DESCRIPTION),
+):
+    database, snapshot = await catalog_sources()
+
+    selected = object_fields(fields, view)
+    theme = await read_through(
+        ("theme", theme_id),
+        lambda: find_theme(database, snapshot, theme_id),
+        MuseumTheme
+    )
+    if theme is None:
+        raise HTTPException(status_code=404, detail="Theme not found")
+
+    return await list_catalog(
+        request, ("theme_objects", theme_id), None if database is None else database.objects, {"themeIds": theme_id}, MuseumObject, after, limit, selected,
+        listing=None if snapshot is None else snapshot.object_listing(theme_id)
+    )
+
+@app.get("/api/v1/objects", response_model=ObjectBatch, response_model_by_alias=False)
+async def get_objects(request: Request, ids: str = Query(..., description="Comma-separated object ids")):
+    database, snapshot = await catalog_sources()
+
+    # Keep the first occurrence of each id, in the order requested
+    object_ids = list(dict.fromkeys(oid.strip() for oid in ids.split(",") if oid.strip()))
+    if not object_ids:
+        raise HTTPException(status_code=400, detail="No object ids given")
+    if len(object_ids) > OBJECTS_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many object ids requested (max {OBJECTS_BATCH_MAX})"
+        )
+
+    # 1. Serve what we can from the shared catalog file and the per-object cache entries
+    shared = await shared_catalog.get(database)
+    found = {}
+    uncached = []
+    for oid in object_ids:
+        entry = shared.get(("object", oid)) if shared is not None else None
+        if entry is None:
+            entry = catalog_cache.get(("object", oid))
+        if entry is not None:
+            found[oid] = entry
+        else:
+            uncached.append(oid)
+
+    # 2. Fetch the rest in a single $in query (or from the snapshot) and cache them individually
+    if uncached:
+        if snapshot is not None:
+            fetched = [obj for obj in map(snapshot.object, uncached) if obj is not None]
+        else:
+            fetched = await database.objects.find({"_id": {"$in": uncached}}).to_list(length=len(uncached))
+        for obj in fetched:
+            entry = build_entry(to_public(MuseumObject, obj))
+            catalog_cache.set(("object", obj["_id"]), entry)
+            found[obj["_id"]] = entry
+
+    # 3. Stitch the pre-serialized objects together in the requested order
+    ordered, missing = order_by_ids(object_ids, found)
+    body = b'{"objects":[' + b",".join(entry.body for entry in ordered) + b'],"missing":' + orjson.dumps(missing) + b"}"
+    return await entry_response(request, CatalogEntry(body=body, etag=compute_etag(body)), cached=False)
+
+# Declared before /objects/{object_id} so "nearby" isn't taken for an id
+@app.get("/api/v1/objects/nearby", response_model=List[NearbyObject])
+async def get_nearby_objects(
+    request: Request,
+    floor: int = Query(..., ge=0),
+    x: float = Query(..., ge=0, le=100, description="Map position, % from the left edge"),
+    y: float = Query(..., ge=0, le=100, description="Map position, % from the top edge"),
+    radius: float = Query(NEARBY_RADIUS_DEFAULT, gt=0, le=150, description="In map-percentage units"),
+    theme: Optional[str] = Query(None, description="Only return objects in this theme"),
+    limit: int = Query(50, ge=1, le=NEARBY_LIMIT_MAX),
+):
+    database, snapshot = await catalog_sources()
+
+    index = await nearby_index.get_index(database, snapshot)
+    body = orjson.dumps(index.nearby(floor, x, y, radius, theme, limit))
+    return await entry_response(request, CatalogEntry(body=body, etag=compute_etag(body)), cached=False)
 
 @app.get("/api/v1/objects/{object_id}", response_model=MuseumObject, response_model_by_alias=False)
-async def get_object(object_id: str):
-    database = db.get_db()
-    if database is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
+async def get_object(
+    object_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    view: Optional[str] = Query(None, description=VIEW_DESCRIPTION),
+):
+    database, snapshot = await catalog_sources()
     
-    obj = await database.objects.find_one({"_id": object_id})
+    selected = object_fields(fields, view)
+    obj = await read_through(
+        projected_key(("object", object_id), selected),
+        lambda: find_object(database, snapshot, object_id, mongo_projection(MuseumObject, selected)),
+        partial_model(MuseumObject, selected)
+    )
     if obj is None:
         raise HTTPException(status_code=404, detail="Object not found")
     
-    return obj
+    return await entry_response(request, obj, canonical=selected is None)
+
+def tour_count(size: str) -> Optional[int]:
+    """
+    Numeric sizes ask the planner for that many stops; anything else names
+    a stored tour configuration (Small, Medium, Large).
+    """
+    # isdecimal, not isdigit: "²" is a digit but int() rejects it
+    if not size.isdecimal():
+        return None
+    count = int(size)
+    if not 1 <= count <= TOUR_SIZE_MAX:
+        raise HTTPException(status_code=400, detail=f"Tour size must be between 1 and {TOUR_SIZE_MAX}")
+    return count
 
 @app.get("/api/v1/tours/{theme_id}/{size}", response_model=List[MuseumObject], response_model_by_alias=False)
-async def get_tour_objects(theme_id: str, size: str):
-    database = db.get_db()
-    if database is None:
-        raise HTTPException(status_code=500, detail="Database not initialized")
+async def get_tour_objects(
+    theme_id: str,
+    size: str,
+    request: Request,
+    start: Optional[str] = Query(None, description="Id of the object to start the route from"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    view: Optional[str] = Query(None, description=VIEW_DESCRIPTION),
+):
+    database, snapshot = await catalog_sources()
     
-    # 1. Find the tour configuration
-    # Note: Case-sensitive match for size (e.g., "Small")
-    tour = await database.tours.find_one({"themeId": theme_id, "size": size})
-    if tour is None:
+    selected = object_fields(fields, view)
+    count = tour_count(size)
+    try:
+        # Planned routes are cached per (theme, size, start) like any other read
+        ordered_objects = await read_through(
+            projected_key(("tour", theme_id, size, start), selected),
+            lambda: plan_tour(database, theme_id, size, count, start, mongo_projection(MuseumObject, selected), snapshot),
+            partial_model(MuseumObject, selected)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if ordered_objects is None:
         raise HTTPException(status_code=404, detail="Tour configuration not found")
-    
-    object_ids = tour.get("objectIds", [])
-    if not object_ids:
-        return []
-
-    # 2. Fetch the actual objects
-    # Note: Mongo's $in doesn't guarantee order, so we'll fetch all and re-order in Python
-    cursor = database.objects.find({"_id": {"$in": object_ids}})
-    objects_list = await cursor.to_list(length=len(object_ids))
-    
-    # 3. Create a mapping for quick lookup
-    objects_map = {obj["_id"]: obj for obj in objects_list}
-    
-    # 4. Reconstruct the list in the correct order
-    ordered_objects = []
-    for oid in object_ids:
-        if oid in objects_map:
-            ordered_objects.append(objects_map[oid])
             
-    return ordered_objects
+    canonical = count is None and start is None and selected is None
+    return await entry_response(request, ordered_objects, canonical=canonical)
+
+@app.get("/api/v1/search", response_model=SearchResults)
+async def search_objects(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=SEARCH_QUERY_MAX_LENGTH, description="Keywords matched against title and descriptions"),
+    theme: Optional[str] = Query(None, description="Only return objects in this theme"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_PAGE_MAX),
+):
+    database, snapshot = await catalog_sources()
+
+    index = await catalog_search.get_index(database, snapshot)
+    total, results = index.search(q, theme, offset, limit)
+    body = orjson.dumps({"total": total, "offset": offset, "limit": limit, "results": results})
+    return await entry_response(request, CatalogEntry(body=body, etag=compute_etag(body)), cached=False)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,243 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Tuple
+
+from pymongo import monitoring
+
+# Request and query latencies, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    """
+    Monotonic counter. Values are plain floats in a dict keyed by the label
+    tuple, so an increment is one dict lookup and one add.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list:
+        lines = self.header()
+        # Copied first: driver threads may add label sets while this runs
+        for labels, value in list(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+    def set(self, labels: Tuple = (), value: float = 0.0) -> None:
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Fixed-bucket histogram. Each label set owns a preallocated list of
+    per-bucket counts (non-cumulative; summed at render time), so observing
+    is a bisect plus three increments.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, labels: Tuple = ()) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            # [bucket counts..., +Inf count, sum]
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list:
+        lines = self.header()
+        # Copied first: driver threads may add label sets or observe while
+        # this runs (see CommandMetricsListener)
+        for labels, series in list(self.series.items()):
+            series = list(series)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {series[-1]}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list]):
+        """
+        Registers a callable returning (name, help, value) gauges computed at
+        scrape time, for state that already lives elsewhere (cache stats,
+        pool sizes) and shouldn't be double-counted on the hot path.
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for name, help, value in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template, method and status.",
+    ("method", "route", "status"),
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method.",
+    ("method", "route"),
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served, by method.",
+    ("method",),
+))
+mongo_latency = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command.",
+    ("collection", "command"),
+))
+mongo_failures = registry.register(Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by collection and command.",
+    ("collection", "command"),
+))
+bcrypt_latency = registry.register(Histogram(
+    "bcrypt_duration_seconds", "Time spent hashing or verifying passwords with bcrypt.",
+    ("operation",),
+))
+bcrypt_wait = registry.register(Histogram(
+    "bcrypt_queue_wait_seconds", "Time password operations waited for a free bcrypt worker.",
+))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route counts, latency and in-flight
+    requests. Routes are labelled by their path template (e.g.
+    /api/v1/objects/{object_id}) so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        in_flight_labels = (method,)
+        http_in_flight.inc(in_flight_labels)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec(in_flight_labels)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_latency.observe(elapsed, (method, path))
+            http_requests.inc((method, path, status[0]))
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Records MongoDB command latency by collection and command name. pymongo
+    only carries the command document on the started event, so its target
+    collection is stashed until the matching succeeded/failed event.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore carries the cursor id there and the collection separately
+        return event.command.get("collection", event.database_name)
+
+    def started(self, event):
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = self._collection(event)
+
+    def _finish(self, event, failed=False):
+        # Events fire on the driver's worker threads, so updates are serialized
+        with self._lock:
+            collection = self._pending.pop((event.connection_id, event.request_id), event.database_name)
+            labels = (collection, event.command_name)
+            mongo_latency.observe(event.duration_micros / 1_000_000, labels)
+            if failed:
+                mongo_failures.inc(labels)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+
+command_metrics = CommandMetricsListener()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import List, Optional
 
 class MuseumTheme(BaseModel):
@@ -14,6 +14,13 @@ class MapPosition(BaseModel):
     top: str
     left: str
 
+class ObjectLocation(BaseModel):
+    # galleryLocation and mapPosition normalized at write time (see locations.py)
+    floor: int
+    room: int
+    x: float
+    y: float
+
 class MuseumObject(BaseModel):
     id: str = Field(alias="_id")
     title: str
@@ -23,10 +30,35 @@ class MuseumObject(BaseModel):
     image: str
     themeIds: List[str]
     mapPosition: MapPosition
+    location: Optional[ObjectLocation] = None
 
     class Config:
         populate_by_name = True
 
+class ObjectBatch(BaseModel):
+    objects: List[MuseumObject]
+    missing: List[str]
+
+class ObjectSummary(BaseModel):
+    id: str
+    title: str
+    image: str
+    galleryLocation: str
+    mapPosition: MapPosition
+
+class SearchHit(ObjectSummary):
+    score: float
+
+class SearchResults(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    results: List[SearchHit]
+
+class NearbyObject(ObjectSummary):
+    location: ObjectLocation
+    distance: float
+
 class Tour(BaseModel):
     themeId: str
     size: str
@@ -35,17 +67,27 @@ class Tour(BaseModel):
     class Config:
         populate_by_name = True
 
-class UserCreate(BaseModel):
+class Credentials(BaseModel):
     email: EmailStr
     password: str
 
+    # New accounts are stored lowercased; lookups and the unique index on
+    # users.email are case-insensitive (see indexes.EMAIL_COLLATION), so
+    # accounts stored in mixed case before this still match
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        return value.lower()
+
+class UserCreate(Credentials):
+    pass
+
 class UserResponse(BaseModel):
     id: str
     email: EmailStr
 
-class UserLogin(BaseModel):
-    email: EmailStr
-    password: str
+class UserLogin(Credentials):
+    pass
 
 class Token(BaseModel):
     access_token: str
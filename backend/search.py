@@ -0,0 +1,132 @@
+import heapq
+import math
+import os
+import re
+import unicodedata
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from catalog import OBJECT_VIEWS, partial_model, to_public
+from catalog_index import CatalogIndex
+from models import MuseumObject
+
+# Query terms in more than this fraction of objects are ignored for matching
+SEARCH_COMMON_TERM_RATIO = float(os.getenv("SEARCH_COMMON_TERM_RATIO", 0.5))
+
+# Matches in the title count more than in the short description, which count
+# more than in the long contextual background
+SEARCH_FIELD_WEIGHTS = {"title": 3.0, "shortDescription": 2.0, "contextualBackground": 1.0}
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were which with".split()
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases, strips accents (so "Mjölnir" matches "mjolnir") and splits on
+    anything that isn't a letter or digit, dropping stopwords.
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return [token for token in _TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    Immutable in-memory inverted index over MuseumObject text fields.
+
+    Each term maps to {doc number: field-weighted term frequency}. A query
+    matches objects containing every selective query term and is scored by
+    tf-idf. Matching runs on set intersections of the postings, and single
+    term queries walk a precomputed impact order (highest tf first), so a
+    page of results never needs every match scored.
+    """
+
+    def __init__(self, documents=()):
+        summary_model = partial_model(MuseumObject, OBJECT_VIEWS["summary"])
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.summaries: List[dict] = []
+        themes: Dict[str, set] = {}
+
+        for doc in documents:
+            number = len(self.summaries)
+            self.summaries.append(to_public(summary_model, doc))
+            for theme_id in doc.get("themeIds", ()):
+                themes.setdefault(theme_id, set()).add(number)
+            for field, weight in SEARCH_FIELD_WEIGHTS.items():
+                for token in tokenize(doc.get(field, "")):
+                    postings = self.postings.setdefault(token, {})
+                    postings[number] = postings.get(number, 0.0) + weight
+
+        count = len(self.summaries)
+        self.theme_docs = {theme_id: frozenset(numbers) for theme_id, numbers in themes.items()}
+        self.idf = {term: math.log(1 + count / len(postings)) for term, postings in self.postings.items()}
+        self._impact_orders: Dict[str, List[int]] = {}
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def stats(self) -> dict:
+        return {"objects": len(self), "terms": len(self.postings)}
+
+    def _impact_order(self, term: str) -> List[int]:
+        order = self._impact_orders.get(term)
+        if order is None:
+            postings = self.postings[term]
+            order = self._impact_orders[term] = sorted(postings, key=lambda number: (-postings[number], number))
+        return order
+
+    def _selective_terms(self, terms: List[str]) -> List[str]:
+        """
+        Drops terms that occur in most of the catalog (they barely change the
+        ranking but make every match expensive), unless all terms are like
+        that, in which case the rarest one is kept.
+        """
+        terms = sorted(terms, key=lambda term: len(self.postings[term]))
+        common = len(self) * SEARCH_COMMON_TERM_RATIO
+        return [term for term in terms if len(self.postings[term]) <= common] or terms[:1]
+
+    def search(self, query: str, theme: Optional[str] = None, offset: int = 0, limit: int = 20) -> Tuple[int, List[dict]]:
+        """
+        Returns (total matches, one page of summaries with a `score`),
+        best match first. Ties keep catalog order.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or any(term not in self.postings for term in terms):
+            return 0, []
+        theme_docs = None
+        if theme is not None:
+            theme_docs = self.theme_docs.get(theme)
+            if not theme_docs:
+                return 0, []
+
+        terms = self._selective_terms(terms)
+        if len(terms) == 1:
+            term = terms[0]
+            postings, idf = self.postings[term], self.idf[term]
+            ranked = self._impact_order(term)
+            if theme_docs is None:
+                total = len(postings)
+            else:
+                total = len(postings.keys() & theme_docs)
+                ranked = (number for number in ranked if number in theme_docs)
+            page = [(postings[number] * idf, number) for number in islice(ranked, offset, offset + limit)]
+        else:
+            weighted = [(self.postings[term], self.idf[term]) for term in terms]
+            # Rarest first, so each intersection is bounded by the smallest set
+            candidates = weighted[0][0].keys()
+            for postings, _ in weighted[1:]:
+                candidates = candidates & postings.keys()
+            if theme_docs is not None:
+                candidates &= theme_docs
+            scored = [(sum(postings[number] * idf for postings, idf in weighted), -number) for number in candidates]
+            total = len(scored)
+            page = [(score, -negated) for score, negated in heapq.nlargest(offset + limit, scored)[offset:]]
+
+        return total, [{**self.summaries[number], "score": round(score, 4)} for score, number in page]
+
+
+catalog_search = CatalogIndex(
+    "search index", SearchIndex, (*SEARCH_FIELD_WEIGHTS, *OBJECT_VIEWS["summary"], "themeIds")
+)
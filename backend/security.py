@@ -1,4 +1,8 @@
+import asyncio
+import hashlib
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Union, Any
 from jose import JWTError, jwt
@@ -7,6 +11,9 @@ from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from database import db
+from cache import TTLCache
+from indexes import EMAIL_COLLATION
+from metrics import bcrypt_latency, bcrypt_wait
 
 load_dotenv()
 
@@ -14,6 +21,20 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
+# bcrypt is deliberately slow (~100-250 ms per call), so it runs off the event loop
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
+# Verified tokens are cached briefly so authenticated requests skip the JWT
+# decode and the users lookup. Set AUTH_TRUST_TOKEN_CLAIMS to build the user
+# straight from the signed claims and never hit MongoDB at all.
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", 60))
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", 10000))
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -23,17 +44,134 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+class PasswordHasherPool:
+    """
+    Runs bcrypt on a bounded worker pool so hashing never blocks the event loop.
+
+    At most `workers` jobs are handed to the executor at a time; further
+    callers wait (asynchronously) for a free worker. Once `max_queue` callers
+    are already waiting, new ones are rejected with a 503 instead of piling
+    up behind the burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor = None
+        self._slots = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+            self._slots = asyncio.Semaphore(self.workers)
+
+    async def run(self, operation: str, fn, *args):
+        self._ensure_started()
+        if self.queued >= self.max_queue and self._slots.locked():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        wait = started_at - enqueued_at
+        self.total_wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        bcrypt_wait.observe(wait)
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self.running -= 1
+            self.completed += 1
+            self.total_run_seconds += elapsed
+            bcrypt_latency.observe(elapsed, (operation,))
+            self._slots.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "avg_run_ms": round(self.total_run_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+        }
+
+password_pool = PasswordHasherPool(
+    workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_MAX_QUEUE,
+    kind=PASSWORD_HASH_EXECUTOR,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run("hash", get_password_hash, password)
+
+def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None, user_id: str = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if user_id is not None:
+        to_encode["uid"] = str(user_id)
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+def invalidate_user(email: str) -> int:
+    """
+    Drops every cached token resolving to this user. Call it whenever a user
+    document changes or is removed.
+    """
+    return token_cache.invalidate_matching(lambda _, value: value[1]["email"] == email)
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    cache_key = _token_digest(token)
+    cached = token_cache.get(cache_key)
+    if cached is not None:
+        return cached[1]
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,13 +184,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    database = db.get_db()
-    if database is None:
-         raise HTTPException(status_code=500, detail="Database not connected")
 
-    user = await database.users.find_one({"email": email})
-    if user is None:
-        raise credentials_exception
-    
-    return user
\ No newline at end of file
+    if AUTH_TRUST_TOKEN_CLAIMS and payload.get("uid"):
+        user = {"_id": payload["uid"], "email": email}
+    else:
+        database = db.get_db()
+        if database is None:
+             raise HTTPException(status_code=500, detail="Database not connected")
+
+        user = await database.users.find_one({"email": email}, collation=EMAIL_COLLATION)
+        if user is None:
+            raise credentials_exception
+
+    # Never keep a token cached past its own expiry
+    ttl = min(TOKEN_CACHE_TTL_SECONDS, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        token_cache.set(cache_key, (payload, user), ttl=ttl)
+
+    return user
@@ -1,42 +1,24 @@
 import asyncio
 import os
 import random
-import time
-import requests
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
 from dotenv import load_dotenv
+from models import MuseumTheme, MuseumObject, Tour
+from database import DB_NAME
+from catalog import bump_catalog_version, catalog_state, ensure_catalog_generation
+from locations import object_location, parse_location
+from tour_planner import plan_route
+from images import ImageResolver
+from snapshot import CATALOG_SNAPSHOT_PATH, load_snapshot, write_snapshot
+from shared_catalog import SHARED_CATALOG_PATH, write_shared_catalog
 
 load_dotenv()
 
 MONGODB_URI = os.getenv("MONGODB_URI")
-if not MONGODB_URI:
-    print("Error: MONGODB_URI not found in environment variables.")
-    exit(1)
-
-PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
-
-def get_pexels_image(query):
-    if not PEXELS_API_KEY:
-        print("Warning: PEXELS_API_KEY not set. Using placeholder images.")
-        return f"https://placehold.co/800x600/gray/white?text={query.replace(' ', '+')}"
-    
-    headers = {"Authorization": PEXELS_API_KEY}
-    try:
-        # Search for the query
-        response = requests.get(
-            f"https://api.pexels.com/v1/search?query={query}&per_page=1",
-            headers=headers,
-            timeout=10
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("photos"):
-                return data["photos"][0]["src"]["large"]
-    except Exception as e:
-        print(f"Error fetching image for '{query}': {e}")
-    
-    # Fallback
-    return f"https://placehold.co/800x600/gray/white?text={query.replace(' ', '+')}"
+# Fixed so reseeding produces the same catalog and only real edits get written
+SEED_RANDOM_SEED = int(os.getenv("SEED_RANDOM_SEED", 42))
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", 1000))
 
 # Themes Data
 themes_data = [
@@ -44,48 +26,48 @@ themes_data = [
         "id": "warfare",
         "name": "Warfare",
         "description": "Explore the history of conflict, weaponry, and the martial arts across different civilizations.",
-        "image": get_pexels_image("Warfare"),
+        "imageQuery": "Warfare",
     },
     {
         "id": "women",
         "name": "Women",
         "description": "Celebrating the roles, contributions, and representations of women throughout history.",
-        "image": get_pexels_image("Women in history"),
+        "imageQuery": "Women in history",
     },
     {
         "id": "art",
         "name": "Art",
         "description": "A journey through human creativity, from ancient sculptures to renaissance masterpieces.",
-        "image": get_pexels_image("Classical Art"),
+        "imageQuery": "Classical Art",
     },
     {
         "id": "religion",
         "name": "Religion",
         "description": "Discover the sacred artifacts, rituals, and beliefs that have shaped human spirituality.",
-        "image": get_pexels_image("Religion"),
+        "imageQuery": "Religion",
     },
     {
         "id": "mesopotamia",
         "name": "Mesopotamia",
         "description": "Artifacts from the 'Cradle of Civilization', the land between the Tigris and Euphrates rivers.",
-        "image": get_pexels_image("Mesopotamia"),
+        "imageQuery": "Mesopotamia",
     },
     {
         "id": "roman-empire",
         "name": "The Roman Empire",
         "description": "The glory of Rome: law, engineering, conquest, and daily life in the ancient empire.",
-        "image": get_pexels_image("Roman Empire"),
+        "imageQuery": "Roman Empire",
     },
     {
         "id": "motherhood",
         "name": "Motherhood",
         "description": "A cross-cultural look at maternity, fertility, and the mother-child bond through the ages.",
-        "image": get_pexels_image("Mother and Child Art"),
+        "imageQuery": "Mother and Child Art",
     },
 ]
 
 # Helper to generate objects
-def generate_objects():
+def generate_objects(rng: random.Random):
     objects = []
     
     # --- Warfare Objects (20) ---
@@ -263,19 +245,19 @@ def generate_objects():
             
             # 20% chance to add a secondary theme if applicable
             themes = [theme_id]
-            if theme_id == "roman-empire" and random.random() < 0.3:
+            if theme_id == "roman-empire" and rng.random() < 0.3:
                 themes.append("warfare")
-            if theme_id == "motherhood" and random.random() < 0.3:
+            if theme_id == "motherhood" and rng.random() < 0.3:
                 themes.append("women")
             if theme_id == "art" and "Statue" in title:
                 themes.append("women") # Just a random overlap for variety
             
             # Map position (randomized)
-            top = f"{random.randint(10, 80)}%"
-            left = f"{random.randint(10, 80)}%"
+            top = f"{rng.randint(10, 80)}%"
+            left = f"{rng.randint(10, 80)}%"
 
             # Location
-            location = f"{random.choice(floors)}, Room {random.choice(rooms)}"
+            location = f"{rng.choice(floors)}, Room {rng.choice(rooms)}"
 
             obj_data = {
                 "id": f"obj-{obj_counter:03d}",
@@ -283,69 +265,140 @@ def generate_objects():
                 "shortDescription": short_desc,
                 "contextualBackground": context,
                 "galleryLocation": location,
-                "image": get_pexels_image(title),
                 "themeIds": themes,
                 "mapPosition": {"top": top, "left": left}
             }
             objects.append(obj_data)
             obj_counter += 1
-            print(f"Generated object {obj_counter-1}: {title}")
-            time.sleep(0.5) # Rate limiting to be safe
 
     return objects
 
-objects_data = generate_objects()
+# Tours walk a short route (see tour_planner.py) through the theme's objects
+TOUR_SIZES = (("Small", 2, 3), ("Medium", 5, 5), ("Large", 8, 8))
 
-# Simple tour generation based on new themes
-tours_data = []
-for theme in themes_data:
-    theme_id = theme["id"]
-    # Find objects for this theme
-    theme_objs = [o["id"] for o in objects_data if theme_id in o["themeIds"]]
-    
-    # Create Small, Medium, Large tours
-    if len(theme_objs) >= 2:
-        tours_data.append({
-            "themeId": theme_id,
-            "size": "Small",
-            "objectIds": theme_objs[:3]
-        })
-    if len(theme_objs) >= 5:
-        tours_data.append({
-            "themeId": theme_id,
-            "size": "Medium",
-            "objectIds": theme_objs[:5]
-        })
-    if len(theme_objs) >= 8:
-        tours_data.append({
-            "themeId": theme_id,
-            "size": "Large",
-            "objectIds": theme_objs[:8]
-        })
+def generate_tours(themes, objects):
+    tours = []
+    for theme in themes:
+        theme_id = theme["id"]
+        # Find objects for this theme
+        theme_objs = [o for o in objects if theme_id in o["themeIds"]]
+        locations = [object_location(o) for o in theme_objs]
+
+        # Create Small, Medium, Large tours
+        for size, minimum, count in TOUR_SIZES:
+            if len(theme_objs) >= minimum:
+                tours.append({
+                    # Natural key, so reseeding can upsert tours in place
+                    "_id": f"{theme_id}:{size}",
+                    "themeId": theme_id,
+                    "size": size,
+                    "objectIds": [theme_objs[i]["id"] for i in plan_route(locations, count)]
+                })
+    return tours
+
+
+def build_catalog(random_seed: int = SEED_RANDOM_SEED):
+    """
+    Generates the themes, objects and tours to seed. Nothing runs at import
+    time, so importing this module is free.
+    """
+    objects = generate_objects(random.Random(random_seed))
+    return themes_data, objects, generate_tours(themes_data, objects)
+
+
+async def upsert_changed(collection, documents, batch_size: int = SEED_BATCH_SIZE):
+    """
+    Upserts the documents that are new or differ from what's stored, in
+    unordered bulk_write batches, and returns (written, unchanged, stale_ids)
+    where stale_ids are stored documents no longer in `documents`. Nothing is
+    deleted here; see delete_stale.
+    """
+    desired = {doc["_id"]: doc for doc in documents}
+    stored = {doc["_id"]: doc async for doc in collection.find({})}
+
+    writes = [
+        ReplaceOne({"_id": _id}, doc, upsert=True)
+        for _id, doc in desired.items()
+        if stored.get(_id) != doc
+    ]
+    for i in range(0, len(writes), batch_size):
+        await collection.bulk_write(writes[i:i + batch_size], ordered=False)
+
+    stale_ids = [_id for _id in stored if _id not in desired]
+    return len(writes), len(desired) - len(writes), stale_ids
+
+
+async def delete_stale(collection, stale_ids, batch_size: int = SEED_BATCH_SIZE):
+    for i in range(0, len(stale_ids), batch_size):
+        await collection.delete_many({"_id": {"$in": stale_ids[i:i + batch_size]}})
+
+
+async def resolve_images(themes, objects):
+    """
+    Looks up every theme and object image concurrently (see images.py) and
+    returns copies of the documents with their `image` URLs filled in.
+    """
+    resolver = ImageResolver()
+    queries = [theme["imageQuery"] for theme in themes] + [obj["title"] for obj in objects]
+    images = await resolver.resolve_many(queries)
+    print(f"Resolved {len(images)} images ({resolver.api_calls} Pexels API calls)")
+
+    themes = [
+        {**{k: v for k, v in theme.items() if k != "imageQuery"}, "image": images[theme["imageQuery"]]}
+        for theme in themes
+    ]
+    objects = [{**obj, "image": images[obj["title"]]} for obj in objects]
+    return themes, objects
 
 
 async def seed():
     client = AsyncIOMotorClient(MONGODB_URI)
-    db = client["museum_tour"]
+    db = client[DB_NAME]
 
     try:
-        # Seed Themes
-        await db.themes.delete_many({})
+        themes, objects, tours = build_catalog()
+        themes, objects = await resolve_images(themes, objects)
+
+        # Validate everything against the API models before touching the
+        # database, so the API can trust stored documents as-is.
         # Set _id to be the same as id
-        themes_to_insert = [{**item, "_id": item["id"]} for item in themes_data]
-        await db.themes.insert_many(themes_to_insert)
-        print(f"Seeded {len(themes_to_insert)} themes")
+        themes_to_write = [{**item, "_id": item["id"]} for item in themes]
+        # Store the location normalized, so the API can query it numerically
+        objects_to_write = [{**item, "_id": item["id"], "location": parse_location(item)._asdict()} for item in objects]
+        for theme in themes_to_write:
+            MuseumTheme.model_validate(theme)
+        for obj in objects_to_write:
+            MuseumObject.model_validate(obj)
+        for tour in tours:
+            Tour.model_validate(tour)
+
+        # Sync instead of delete-and-insert, so the live API never sees an
+        # empty collection. Themes and objects are upserted before the tours
+        # that reference them, and stale documents are only deleted once
+        # every tour points at the new catalog.
+        stale = []
+        changed = False
+        for name, documents in (("themes", themes_to_write), ("objects", objects_to_write), ("tours", tours)):
+            written, unchanged, stale_ids = await upsert_changed(db[name], documents)
+            stale.append((name, stale_ids))
+            changed = changed or written > 0 or bool(stale_ids)
+            print(f"Synced {name}: {written} written, {unchanged} unchanged, {len(stale_ids)} stale")
+
+        for name, stale_ids in reversed(stale):
+            await delete_stale(db[name], stale_ids)
 
-        # Seed Objects
-        await db.objects.delete_many({})
-        objects_to_insert = [{**item, "_id": item["id"]} for item in objects_data]
-        await db.objects.insert_many(objects_to_insert)
-        print(f"Seeded {len(objects_to_insert)} objects")
+        if changed:
+            await bump_catalog_version(db)
+        else:
+            await ensure_catalog_generation(db)
 
-        # Seed Tours
-        await db.tours.delete_many({})
-        await db.tours.insert_many(tours_data)
-        print(f"Seeded {len(tours_data)} tours")
+        # Written at the state just stored, so API workers reading this
+        # database can serve the catalog from memory until it changes again
+        write_snapshot(CATALOG_SNAPSHOT_PATH, await catalog_state(db), themes_to_write, objects_to_write, tours)
+        print(f"Wrote catalog snapshot to {CATALOG_SNAPSHOT_PATH}")
+        # Pre-serialized responses, memory-mapped and shared by every worker
+        await write_shared_catalog(SHARED_CATALOG_PATH, load_snapshot(CATALOG_SNAPSHOT_PATH))
+        print(f"Wrote shared catalog to {SHARED_CATALOG_PATH}")
 
         print("Database seeding completed successfully!")
 
@@ -355,4 +408,7 @@ async def seed():
         client.close()
 
 if __name__ == "__main__":
-    asyncio.run(seed())
\ No newline at end of file
+    if not MONGODB_URI:
+        print("Error: MONGODB_URI not found in environment variables.")
+        exit(1)
+    asyncio.run(seed())
@@ -0,0 +1,156 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+from catalog import CatalogState, plan_tour, to_public
+from compression import COMPRESSION_MIN_SIZE, SUPPORTED_ENCODINGS, compress
+from http_cache import CatalogEntry, build_entry, variant_etag
+from models import MuseumObject, MuseumTheme
+from snapshot import CATALOG_SNAPSHOT_CHECK_SECONDS, SnapshotStore, pack_state, unpack_state
+
+SHARED_CATALOG_PATH = os.getenv("SHARED_CATALOG_PATH", str(Path(__file__).parent / "catalog.shared"))
+
+# File layout: magic, then (format, catalog version, catalog generation,
+# index offset, index length), then the response bodies and their compressed
+# variants back to back, then a JSON index mapping each key to
+# [offset, length, etag, {encoding: [offset, length, etag]}].
+SHARED_CATALOG_MAGIC = b"MTCSHRD\0"
+SHARED_CATALOG_FORMAT = 3
+_HEADER = struct.Struct("<Hq32sqq")
+
+
+def shared_key(key: tuple) -> Optional[str]:
+    """
+    Maps a catalog cache key (see main.read_through) to its key in the
+    shared file. Only full documents are stored, so projected views and
+    tours planned from a start object return None.
+    """
+    if len(key) == 2 and key[0] in ("theme", "object"):
+        return f"{key[0]}\0{key[1]}"
+    if len(key) == 4 and key[0] == "tour" and key[3] is None:
+        return f"tour\0{key[1]}\0{key[2]}"
+    return None
+
+
+class SharedCatalog:
+    """
+    A read-only memory map of pre-serialized catalog responses. The pages
+    live in the OS page cache, so every worker mapping the same file shares
+    one copy; entries are served as memoryview slices of the map without
+    copying. Bodies above COMPRESSION_MIN_SIZE come with their br/gzip
+    variants, so workers never compress them either. Only the small index
+    is held per worker.
+    """
+
+    def __init__(self, mapped: mmap.mmap, state: CatalogState, index: dict):
+        self.mapped = mapped
+        self.view = memoryview(mapped)
+        self.state = state
+        self.index = index
+        self.hits = 0
+
+    def get(self, key: tuple) -> Optional[CatalogEntry]:
+        name = shared_key(key)
+        slot = self.index.get(name) if name is not None else None
+        if slot is None:
+            return None
+        offset, length, etag, variants = slot
+        self.hits += 1
+        return CatalogEntry(
+            body=self.view[offset:offset + length],
+            etag=etag,
+            variants={
+                encoding: CatalogEntry(body=self.view[start:start + size], etag=variant)
+                for encoding, (start, size, variant) in variants.items()
+            },
+        )
+
+    @property
+    def version(self):
+        return self.state.version
+
+    def stats(self) -> dict:
+        return {"catalog_version": self.version, "entries": len(self.index), "bytes": len(self.mapped), "hits": self.hits}
+
+
+async def write_shared_catalog(path: str, snapshot) -> None:
+    """
+    Serializes every theme, object and stored tour of a catalog snapshot
+    (see snapshot.py) the way the API would, and writes them to `path`.
+    Tours go through plan_tour so their order matches a live request.
+    Compressible bodies are also stored in every supported encoding at the
+    maximum levels, as for canonical entries served from the cache. The
+    file is renamed into place; workers holding the old map keep reading it
+    until they pick up the new one.
+    """
+    entries = []
+    for theme_id in snapshot.themes:
+        entries.append((f"theme\0{theme_id}", build_entry(to_public(MuseumTheme, snapshot.theme(theme_id)))))
+    for object_id in snapshot.objects:
+        entries.append((f"object\0{object_id}", build_entry(to_public(MuseumObject, snapshot.object(object_id)))))
+    for theme_id, size in snapshot.tours:
+        objects = await plan_tour(None, theme_id, size, snapshot=snapshot)
+        entries.append((f"tour\0{theme_id}\0{size}", build_entry(to_public(MuseumObject, objects))))
+
+    offset = len(SHARED_CATALOG_MAGIC) + _HEADER.size
+    index = {}
+    bodies = []
+    for name, entry in entries:
+        variants = {}
+        index[name] = [offset, len(entry.body), entry.etag, variants]
+        bodies.append(entry.body)
+        offset += len(entry.body)
+        if len(entry.body) < COMPRESSION_MIN_SIZE:
+            continue
+        for encoding in SUPPORTED_ENCODINGS:
+            body = compress(entry.body, encoding)
+            variants[encoding] = [offset, len(body), variant_etag(entry.etag, encoding)]
+            bodies.append(body)
+            offset += len(body)
+    index_body = orjson.dumps(index)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SHARED_CATALOG_MAGIC + _HEADER.pack(SHARED_CATALOG_FORMAT, *pack_state(snapshot.state), offset, len(index_body)))
+        for body in bodies:
+            f.write(body)
+        f.write(index_body)
+    os.replace(tmp_path, path)
+
+
+def open_shared_catalog(path: str) -> Optional[SharedCatalog]:
+    """
+    Maps a file written by write_shared_catalog. Returns None when the file
+    is missing, truncated or from another format version.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return None
+            # The map stays valid after the file is closed or replaced
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+    prefix = len(SHARED_CATALOG_MAGIC) + _HEADER.size
+    if size < prefix or mapped[:len(SHARED_CATALOG_MAGIC)] != SHARED_CATALOG_MAGIC:
+        print(f"Ignoring {path}: not a shared catalog")
+        return None
+    fmt, version, generation, index_offset, index_length = _HEADER.unpack_from(mapped, len(SHARED_CATALOG_MAGIC))
+    if fmt != SHARED_CATALOG_FORMAT or index_offset + index_length != size:
+        print(f"Ignoring {path}: format {fmt}, expected {SHARED_CATALOG_FORMAT}, or truncated")
+        return None
+
+    index = {name: tuple(slot) for name, slot in orjson.loads(mapped[index_offset:]).items()}
+    return SharedCatalog(mapped, unpack_state(version, generation), index)
+
+
+# catalog_snapshot already drops the catalog cache when the catalog changes
+shared_catalog = SnapshotStore(
+    SHARED_CATALOG_PATH, open_shared_catalog, "shared catalog", CATALOG_SNAPSHOT_CHECK_SECONDS, invalidate_cache=False
+)
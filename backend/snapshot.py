@@ -0,0 +1,338 @@
+import asyncio
+import os
+import struct
+import sys
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import orjson
+from pymongo.errors import PyMongoError
+from cache import invalidate_catalog
+from catalog import CatalogState, catalog_state
+from locations import Location, parse_location
+
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", str(Path(__file__).parent / "catalog.snapshot"))
+# How often a worker re-checks the snapshot file and the catalog state
+CATALOG_SNAPSHOT_CHECK_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_CHECK_SECONDS", 30))
+
+# File layout: magic, then (format, catalog version, catalog generation,
+# payload length), then a JSON array of plain row arrays. Bump the format
+# when rows change shape.
+SNAPSHOT_MAGIC = b"MTCSNAP\0"
+SNAPSHOT_FORMAT = 2
+_HEADER = struct.Struct("<Hq32sq")
+_NO_VERSION = -1
+
+
+def pack_state(state: CatalogState) -> tuple:
+    """
+    Header fields (version, generation) for a catalog state; see unpack_state.
+    """
+    version = _NO_VERSION if state.version is None else state.version
+    return version, (state.generation or "").encode("ascii")
+
+
+def unpack_state(version: int, generation: bytes) -> CatalogState:
+    generation = generation.rstrip(b"\0").decode("ascii")
+    return CatalogState(generation or None, None if version == _NO_VERSION else version)
+
+
+class ThemeRecord:
+    __slots__ = ("id", "name", "description", "image")
+
+    def __init__(self, id, name, description, image):
+        self.id = sys.intern(id)
+        self.name = name
+        self.description = description
+        self.image = image
+
+    def to_doc(self) -> dict:
+        return {"_id": self.id, "name": self.name, "description": self.description, "image": self.image}
+
+
+class ObjectRecord:
+    """
+    One museum object. Theme ids are interned (each appears on many objects)
+    and the nested documents are flattened into tuples.
+    """
+    __slots__ = (
+        "id", "title", "shortDescription", "contextualBackground", "galleryLocation",
+        "image", "themeIds", "mapPosition", "location",
+    )
+
+    def __init__(self, id, title, shortDescription, contextualBackground, galleryLocation, image, themeIds, mapPosition, location):
+        self.id = id
+        self.title = title
+        self.shortDescription = shortDescription
+        self.contextualBackground = contextualBackground
+        self.galleryLocation = galleryLocation
+        self.image = image
+        self.themeIds = tuple(sys.intern(theme_id) for theme_id in themeIds)
+        self.mapPosition = tuple(mapPosition)
+        self.location = tuple(location) if location is not None else None
+
+    def to_doc(self) -> dict:
+        doc = {
+            "_id": self.id,
+            "title": self.title,
+            "shortDescription": self.shortDescription,
+            "contextualBackground": self.contextualBackground,
+            "galleryLocation": self.galleryLocation,
+            "image": self.image,
+            "themeIds": list(self.themeIds),
+            "mapPosition": {"top": self.mapPosition[0], "left": self.mapPosition[1]},
+        }
+        if self.location is not None:
+            floor, room, x, y = self.location
+            doc["location"] = {"floor": floor, "room": room, "x": x, "y": y}
+        return doc
+
+
+class Listing:
+    """
+    Keyset pagination over a sorted tuple of ids, matching
+    catalog.fetch_page: `after` is exclusive and the next cursor is the last
+    id returned when more remain.
+    """
+    __slots__ = ("ids", "lookup")
+
+    def __init__(self, ids: tuple, lookup):
+        self.ids = ids
+        self.lookup = lookup
+
+    def bounds(self, after=None, limit: Optional[int] = None):
+        start = bisect_right(self.ids, after) if after is not None else 0
+        end = len(self.ids) if limit is None else start + limit
+        return start, end
+
+    def page(self, after=None, limit: Optional[int] = None):
+        start, end = self.bounds(after, limit)
+        docs = [self.lookup(doc_id) for doc_id in self.ids[start:end]]
+        next_cursor = self.ids[end - 1] if end < len(self.ids) and docs else None
+        return docs, next_cursor
+
+    def scan(self, after=None, limit: Optional[int] = None):
+        """
+        Yields the documents page() would return one at a time, so a
+        streamed export only builds the document being sent.
+        """
+        start, end = self.bounds(after, limit)
+        for doc_id in self.ids[start:end]:
+            yield self.lookup(doc_id)
+
+
+class CatalogSnapshot:
+    """
+    The whole catalog held in memory: themes, objects and the stored tours
+    (as tuples of object ids, in route order). Lookups return documents
+    shaped like MongoDB's, so they go through the same validation as
+    database reads.
+    """
+
+    def __init__(self, state: CatalogState, themes: Dict[str, ThemeRecord], objects: Dict[str, ObjectRecord], tours: Dict[Tuple[str, str], tuple]):
+        self.state = state
+        self.themes = themes
+        self.objects = objects
+        self.tours = tours
+        theme_objects: Dict[str, list] = {}
+        for record in objects.values():
+            for theme_id in record.themeIds:
+                theme_objects.setdefault(theme_id, []).append(record.id)
+        self.theme_objects = {theme_id: tuple(sorted(ids)) for theme_id, ids in theme_objects.items()}
+        self.theme_listing = Listing(tuple(sorted(themes)), self.theme)
+
+    def theme(self, theme_id: str) -> Optional[dict]:
+        record = self.themes.get(theme_id)
+        return record.to_doc() if record is not None else None
+
+    def object(self, object_id: str) -> Optional[dict]:
+        record = self.objects.get(object_id)
+        return record.to_doc() if record is not None else None
+
+    def object_listing(self, theme_id: str) -> Listing:
+        return Listing(self.theme_objects.get(theme_id, ()), self.object)
+
+    def theme_locations(self, theme_id: str) -> list:
+        """
+        (id, Location) for every object in a theme, in id order.
+        """
+        located = []
+        for object_id in self.theme_objects.get(theme_id, ()):
+            record = self.objects[object_id]
+            location = Location(*record.location) if record.location is not None else parse_location(record.to_doc())
+            located.append((object_id, location))
+        return located
+
+    def tour(self, theme_id: str, size: str) -> Optional[list]:
+        object_ids = self.tours.get((theme_id, size))
+        if object_ids is None:
+            return None
+        return [self.object(oid) for oid in object_ids if oid in self.objects]
+
+    def object_documents(self) -> list:
+        return [record.to_doc() for record in self.objects.values()]
+
+    @property
+    def version(self):
+        return self.state.version
+
+    def stats(self) -> dict:
+        return {"catalog_version": self.version, "themes": len(self.themes), "objects": len(self.objects), "tours": len(self.tours)}
+
+
+def write_snapshot(path: str, state: CatalogState, themes, objects, tours) -> None:
+    """
+    Writes the catalog (documents as stored in MongoDB) at `state` to
+    `path`. The file is written beside the target and renamed over it, so
+    readers never see a partial snapshot.
+    """
+    payload = orjson.dumps([
+        [[t["_id"], t["name"], t["description"], t["image"]] for t in themes],
+        [
+            [o["_id"], o["title"], o["shortDescription"], o["contextualBackground"], o["galleryLocation"], o["image"],
+             o["themeIds"], [o["mapPosition"]["top"], o["mapPosition"]["left"]],
+             [o["location"][k] for k in ("floor", "room", "x", "y")] if o.get("location") else None]
+            for o in objects
+        ],
+        [[t["themeId"], t["size"], t["objectIds"]] for t in tours],
+    ])
+
+    header = SNAPSHOT_MAGIC + _HEADER.pack(SNAPSHOT_FORMAT, *pack_state(state), len(payload))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + payload)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> Optional[CatalogSnapshot]:
+    """
+    Reads a snapshot written by write_snapshot. Returns None when the file
+    is missing, truncated or from another format version. Takes a while for
+    a large catalog, so SnapshotStore runs it off the event loop.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    prefix = len(SNAPSHOT_MAGIC) + _HEADER.size
+    if not data.startswith(SNAPSHOT_MAGIC) or len(data) < prefix:
+        print(f"Ignoring {path}: not a catalog snapshot")
+        return None
+    fmt, version, generation, length = _HEADER.unpack_from(data, len(SNAPSHOT_MAGIC))
+    if fmt != SNAPSHOT_FORMAT or len(data) - prefix != length:
+        print(f"Ignoring {path}: format {fmt}, expected {SNAPSHOT_FORMAT}, or truncated")
+        return None
+
+    theme_rows, object_rows, tour_rows = orjson.loads(memoryview(data)[prefix:])
+    themes = {row[0]: ThemeRecord(*row) for row in theme_rows}
+    objects = {row[0]: ObjectRecord(*row) for row in object_rows}
+    tours = {(sys.intern(theme_id), size): tuple(object_ids) for theme_id, size, object_ids in tour_rows}
+    return CatalogSnapshot(unpack_state(version, generation), themes, objects, tours)
+
+
+class SnapshotStore:
+    """
+    Holds the current snapshot for this worker. Every
+    CATALOG_SNAPSHOT_CHECK_SECONDS it reloads the file if it was replaced
+    and compares the snapshot's catalog state (generation and version) with
+    MongoDB's; a stale snapshot is set aside so reads fall back to MongoDB.
+    If MongoDB can't be reached the snapshot is checked against the last
+    state seen, or keeps serving if there is none.
+
+    Checks run as a background task, and files are loaded in a worker
+    thread and swapped in once ready, so requests keep being served from
+    the current snapshot meanwhile. With `invalidate_cache`, a change
+    of catalog state also drops the in-process catalog cache.
+
+    `load` turns the file into the object served; anything with `state`,
+    `version` and `stats()` works (see shared_catalog.py).
+    """
+
+    def __init__(self, path: str = CATALOG_SNAPSHOT_PATH, load=load_snapshot, name: str = "catalog snapshot",
+                 check_seconds: float = CATALOG_SNAPSHOT_CHECK_SECONDS, invalidate_cache: bool = True):
+        self.path = path
+        self.load = load
+        self.name = name
+        self.check_seconds = check_seconds
+        self.invalidate_cache = invalidate_cache
+        self.snapshot = None
+        self.stale = False
+        self.file_id = None
+        self.catalog_state = None
+        self.checked_at = 0.0
+        self.loads = 0
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def _load_if_changed(self):
+        """
+        Returns (snapshot, file_id) for the file on disk, reusing the
+        current snapshot when the file hasn't been replaced.
+        """
+        try:
+            st = await asyncio.to_thread(os.stat, self.path)
+        except FileNotFoundError:
+            return None, None
+        # Writers rename a new file into place, which changes the inode
+        file_id = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if file_id == self.file_id:
+            return self.snapshot, file_id
+        snapshot = await asyncio.to_thread(self.load, self.path)
+        if snapshot is not None:
+            self.loads += 1
+            print(f"Loaded {self.name} v{snapshot.version}")
+        return snapshot, file_id
+
+    async def refresh(self, database):
+        async with self._lock:
+            self.checked_at = time.monotonic()
+            snapshot, file_id = await self._load_if_changed()
+            current = None
+            if database is not None:
+                try:
+                    current = await catalog_state(database)
+                except PyMongoError as e:
+                    print(f"Checking the catalog state failed, serving {self.name} as is: {e}")
+
+            # Swap everything in together, with no await in between
+            if current is not None and self.catalog_state is not None and current != self.catalog_state and self.invalidate_cache:
+                dropped = invalidate_catalog()
+                print(f"Catalog changed to v{current.version}; dropped {dropped} cached entries")
+            if current is not None:
+                self.catalog_state = current
+            # Compared with the last state seen, if MongoDB didn't answer now
+            known = self.catalog_state
+            self.snapshot, self.file_id = snapshot, file_id
+            self.stale = snapshot is not None and known is not None and snapshot.state != known
+            if self.stale:
+                print(f"{self.name.capitalize()} {snapshot.state} is stale (catalog is {known}); reading from MongoDB")
+
+    async def _refresh_in_background(self, database):
+        try:
+            await self.refresh(database)
+        except Exception as e:
+            # Keep serving the current snapshot; the next check retries
+            print(f"Refreshing the {self.name} failed: {e}")
+
+    async def get(self, database):
+        # The check runs in the background; no request waits for it
+        if time.monotonic() - self.checked_at >= self.check_seconds and (self._refresh is None or self._refresh.done()):
+            self.checked_at = time.monotonic()
+            self._refresh = asyncio.create_task(self._refresh_in_background(database))
+        return None if self.stale else self.snapshot
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "loaded": self.snapshot is not None,
+            "stale": self.stale,
+            "loads": self.loads,
+            **(self.snapshot.stats() if self.snapshot is not None else {}),
+        }
+
+
+catalog_snapshot = SnapshotStore()
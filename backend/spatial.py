@@ -0,0 +1,95 @@
+import heapq
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+from catalog import OBJECT_VIEWS, partial_model, to_public
+from catalog_index import CatalogIndex
+from locations import object_location
+from models import MuseumObject
+
+# Grid cell edge, in map-percentage units. A query only visits the cells
+# its radius overlaps, so cost tracks the objects nearby, not the catalog.
+SPATIAL_CELL_SIZE = float(os.getenv("SPATIAL_CELL_SIZE", 5))
+
+
+class SpatialIndex:
+    """
+    Immutable per-floor uniform grid over object map positions.
+    """
+
+    def __init__(self, documents=(), cell_size: float = SPATIAL_CELL_SIZE):
+        summary_model = partial_model(MuseumObject, OBJECT_VIEWS["summary"])
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int, int], List[int]] = {}
+        self.points: List[Tuple[float, float]] = []
+        self.summaries: List[dict] = []
+        self.theme_ids: List[frozenset] = []
+
+        for doc in documents:
+            number = len(self.summaries)
+            location = object_location(doc)
+            self.points.append((location.x, location.y))
+            self.summaries.append({**to_public(summary_model, doc), "location": location._asdict()})
+            self.theme_ids.append(frozenset(doc.get("themeIds", ())))
+            self.cells.setdefault(self._cell(location.floor, location.x, location.y), []).append(number)
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def stats(self) -> dict:
+        return {"objects": len(self), "cells": len(self.cells)}
+
+    def _cell(self, floor: int, x: float, y: float) -> Tuple[int, int, int]:
+        return floor, math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def nearby(self, floor: int, x: float, y: float, radius: float, theme: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """
+        Returns up to `limit` objects on `floor` within `radius` of (x, y),
+        nearest first, each with its `distance`.
+
+        Cells are visited in rings around the one containing (x, y), keeping
+        the `limit` nearest hits in a bounded heap. Everything past ring r is
+        at least r cells away, so the search stops as soon as the ring
+        can't beat the current `limit`-th hit.
+        """
+        _, cx, cy = self._cell(floor, x, y)
+        max_ring = math.ceil(radius / self.cell_size) + 1
+
+        # Max-heap of the best hits so far, as (-distance, -number)
+        best = []
+        for ring in range(max_ring + 1):
+            for cell in self._ring(floor, cx, cy, ring):
+                for number in self.cells.get(cell, ()):
+                    if theme is not None and theme not in self.theme_ids[number]:
+                        continue
+                    px, py = self.points[number]
+                    distance = math.hypot(px - x, py - y)
+                    if distance > radius:
+                        continue
+                    if len(best) < limit:
+                        heapq.heappush(best, (-distance, -number))
+                    elif (-distance, -number) > best[0]:
+                        heapq.heapreplace(best, (-distance, -number))
+            if len(best) >= limit and -best[0][0] <= ring * self.cell_size:
+                break
+
+        found = sorted((-distance, -number) for distance, number in best)
+        return [{**self.summaries[number], "distance": round(distance, 3)} for distance, number in found]
+
+    @staticmethod
+    def _ring(floor: int, cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield floor, cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield floor, cx + dx, cy - ring
+            yield floor, cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield floor, cx - ring, cy + dy
+            yield floor, cx + ring, cy + dy
+
+
+nearby_index = CatalogIndex(
+    "spatial index", SpatialIndex, (*OBJECT_VIEWS["summary"], "themeIds", "location")
+)
@@ -0,0 +1,147 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from admission import AUTH_RETRY_AFTER_SECONDS, ConcurrencyLimiter, RateLimiter
+
+# Exercises admission.py's limiters directly, with a fake clock for the
+# token buckets; no server or database needed.
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def rejected(limiter, key):
+    try:
+        limiter.check(key)
+    except HTTPException as e:
+        assert e.status_code == 429, f"Expected 429, got {e.status_code}"
+        return int(e.headers["Retry-After"])
+    return None
+
+
+def test_rate_limiter_burst_and_refill():
+    print("Testing token bucket burst and refill...")
+    clock = FakeClock()
+    # One token per second, at most 3 at once
+    limiter = RateLimiter("test", rate_per_minute=60, burst=3, clock=clock)
+
+    # The burst is available straight away, then requests are refused
+    for _ in range(3):
+        assert rejected(limiter, "a") is None
+    assert rejected(limiter, "a") == 1
+    assert limiter.limited == 1
+
+    # Other keys have their own bucket
+    assert rejected(limiter, "b") is None
+
+    # Half a token isn't enough; a whole one is
+    clock.advance(0.5)
+    assert rejected(limiter, "a") == 1
+    clock.advance(0.5)
+    assert rejected(limiter, "a") is None
+    assert rejected(limiter, "a") == 1
+
+    # Refill is capped at the burst, however long the key was idle
+    clock.advance(3600)
+    for _ in range(3):
+        assert rejected(limiter, "a") is None
+    assert rejected(limiter, "a") == 1
+    print("Burst, refill and the cap behave as configured.")
+
+
+def test_rate_limiter_retry_after():
+    print("Testing Retry-After for a slow refill rate...")
+    clock = FakeClock()
+    # One token every 10 seconds
+    limiter = RateLimiter("test", rate_per_minute=6, burst=1, clock=clock)
+
+    assert limiter.hit("a") == 0.0
+    assert abs(limiter.hit("a") - 10.0) < 1e-9
+    clock.advance(4)
+    assert abs(limiter.hit("a") - 6.0) < 1e-9
+    assert rejected(limiter, "a") == 6
+    print("Retry-After counts down to the next token.")
+
+
+def test_concurrency_limiter_sheds_past_the_queue():
+    print("Testing that requests past the queue are shed with a 503...")
+
+    async def run():
+        limiter = ConcurrencyLimiter("test", limit=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+        order = []
+
+        async def request(name):
+            async with limiter.slot():
+                order.append(name)
+                await release.wait()
+
+        running = asyncio.ensure_future(request("running"))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(request("queued"))
+        await asyncio.sleep(0)
+        assert limiter.running == 1 and limiter.waiting == 1
+
+        # The slot is taken and the queue is full: shed immediately
+        try:
+            await request("shed")
+            raise AssertionError("Expected a 503")
+        except HTTPException as e:
+            assert e.status_code == 503, f"Expected 503, got {e.status_code}"
+            assert e.headers["Retry-After"] == str(AUTH_RETRY_AFTER_SECONDS)
+        assert limiter.shed == 1
+
+        # The queued request gets the slot once it's released
+        release.set()
+        await asyncio.gather(running, queued)
+        assert order == ["running", "queued"]
+        assert limiter.admitted == 2 and limiter.running == 0 and limiter.waiting == 0
+
+    asyncio.run(run())
+    print("Third request was shed; the queued one ran.")
+
+
+def test_concurrency_limiter_queue_timeout():
+    print("Testing that a queued request is shed after the queue timeout...")
+
+    async def run():
+        limiter = ConcurrencyLimiter("test", limit=1, max_queue=5, queue_timeout=0.01)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        try:
+            async with limiter.slot():
+                raise AssertionError("Expected the queued request to time out")
+        except HTTPException as e:
+            assert e.status_code == 503
+        assert limiter.shed == 1 and limiter.waiting == 0
+
+        release.set()
+        await holder
+        # The slot is free again
+        async with limiter.slot():
+            assert limiter.running == 1
+
+    asyncio.run(run())
+    print("Queued request was shed after the timeout and the slot recovered.")
+
+
+if __name__ == "__main__":
+    test_rate_limiter_burst_and_refill()
+    test_rate_limiter_retry_after()
+    test_concurrency_limiter_sheds_past_the_queue()
+    test_concurrency_limiter_queue_timeout()
@@ -0,0 +1,50 @@
+import urllib.request
+import urllib.error
+import urllib.parse
+import json
+
+BASE_URL = "http://127.0.0.1:8000/api/v1/objects"
+
+def test_bulk_objects():
+    print("Testing bulk object fetch...")
+
+    # 1. Fetch several objects, out of natural order, with one unknown id
+    requested = ["obj-005", "obj-001", "does-not-exist", "obj-003"]
+    print(f"\n1. Fetching {requested}...")
+    url = f"{BASE_URL}?" + urllib.parse.urlencode({"ids": ",".join(requested)})
+    try:
+        with urllib.request.urlopen(url) as response:
+            status = response.getcode()
+            body = json.loads(response.read().decode())
+            print(f"Status: {status}")
+
+            received_ids = [obj["id"] for obj in body["objects"]]
+            print(f"Received IDs: {received_ids}")
+            print(f"Missing IDs: {body['missing']}")
+
+            assert received_ids == ["obj-005", "obj-001", "obj-003"]
+            assert body["missing"] == ["does-not-exist"]
+            print("Objects returned in requested order with missing ids reported.")
+    except urllib.error.HTTPError as e:
+        print(f"Failed to fetch objects. Status: {e.code}")
+        print(e.read().decode())
+        return
+    except urllib.error.URLError as e:
+        print(f"Connection failed: {e.reason}")
+        print("Make sure the server is running.")
+        return
+
+    # 2. Oversized batch must be rejected
+    print("\n2. Requesting more ids than the batch limit...")
+    too_many = ",".join(f"obj-{i:03d}" for i in range(1, 1002))
+    try:
+        urllib.request.urlopen(f"{BASE_URL}?" + urllib.parse.urlencode({"ids": too_many}))
+        print("Error: Should have failed")
+    except urllib.error.HTTPError as e:
+        if e.code == 400:
+            print(f"Caught expected 400: {e.read().decode()}")
+        else:
+            print(f"Unexpected error: {e.code}")
+
+if __name__ == "__main__":
+    test_bulk_objects()
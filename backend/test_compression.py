@@ -0,0 +1,99 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from compression import NegotiatedGZipMiddleware, SUPPORTED_ENCODINGS, negotiate_encoding
+
+# Exercises Accept-Encoding negotiation directly; no server or database
+# needed.
+
+PREFERRED = SUPPORTED_ENCODINGS[0]
+
+
+def test_negotiate_encoding():
+    print("Testing Accept-Encoding negotiation...")
+
+    # No header, or nothing we support
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("deflate, zstd") is None
+
+    # q=0 means "not acceptable", even for an encoding we'd otherwise pick
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("gzip;q=0, br;q=0") is None
+    assert negotiate_encoding("gzip;q=0, *") == ("br" if "br" in SUPPORTED_ENCODINGS else None)
+    assert negotiate_encoding("gzip;q=bogus") is None
+
+    # * stands in for anything not listed
+    assert negotiate_encoding("*") == PREFERRED
+    assert negotiate_encoding("*;q=0") is None
+    assert negotiate_encoding("*;q=0, gzip") == "gzip"
+
+    # Higher q wins; ties go to brotli when it's available
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip, br") == PREFERRED
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.5") == PREFERRED
+    assert negotiate_encoding("GZIP ; q=0.9, br;q=0.1") == "gzip"
+    if "br" in SUPPORTED_ENCODINGS:
+        assert negotiate_encoding("br;q=0.1, gzip;q=0.9") == "gzip"
+        assert negotiate_encoding("br;q=0.9, gzip;q=0.1") == "br"
+
+    print("Negotiation honours q=0, * and ties.")
+
+
+async def call(app, accept_encoding):
+    headers = [(b"host", b"test")]
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    start = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update((k.decode().lower(), v.decode()) for k, v in message["headers"])
+
+    await app(scope, receive, send)
+    return start.get("content-encoding")
+
+
+def test_gzip_middleware_honours_q_values():
+    print("Testing that the gzip middleware honours q-values...")
+    app = FastAPI()
+    app.add_middleware(NegotiatedGZipMiddleware, minimum_size=10)
+
+    @app.get("/")
+    async def body():
+        return Response(content=b'{"a":"' + b"x" * 2000 + b'"}', media_type="application/x-ndjson")
+
+    async def run():
+        assert await call(app, "gzip") == "gzip"
+        assert await call(app, "gzip;q=0.5, br") == "gzip"
+        assert await call(app, "gzip;q=0, br;q=0") is None
+        assert await call(app, "*;q=0") is None
+        assert await call(app, None) is None
+
+    asyncio.run(run())
+    print("Refused encodings are left uncompressed.")
+
+
+if __name__ == "__main__":
+    test_negotiate_encoding()
+    test_gzip_middleware_honours_q_values()
@@ -0,0 +1,125 @@
+import urllib.request
+import urllib.error
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_PORT = 8003
+CONCURRENT_SIGNUPS = 20
+
+# Every signup comes from one IP for one address, so the default rate
+# limits (see admission.py) would answer most of them with 429 before the
+# insert. The server started here lifts them, and lets every signup wait
+# for an admission slot, so all of them race on the unique index.
+SIGNUP_SERVER_ENV = {
+    "AUTH_IP_BURST": "1000",
+    "AUTH_EMAIL_BURST": "1000",
+    "AUTH_QUEUE_LIMIT": "1000",
+    "AUTH_QUEUE_TIMEOUT_SECONDS": "60",
+}
+
+def read_stream(stream, prefix):
+    for line in iter(stream.readline, ''):
+        print(f"[{prefix}] {line.strip()}")
+    stream.close()
+
+def start_server(port):
+    """
+    Starts uvicorn with SIGNUP_SERVER_ENV, the way loadtest.py does, then
+    waits for /healthz.
+    """
+    print(f"Starting backend server on port {port}...")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(BACKEND_DIR),
+         "--host", "127.0.0.1", "--port", str(port), "--no-access-log"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env={**os.environ, **SIGNUP_SERVER_ENV},
+        text=True,
+        bufsize=1
+    )
+    for stream, prefix in ((process.stdout, "SERVER_OUT"), (process.stderr, "SERVER_ERR")):
+        threading.Thread(target=read_stream, args=(stream, prefix), daemon=True).start()
+
+    for _ in range(100):
+        if process.poll() is not None:
+            break
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz") as response:
+                if response.getcode() == 200:
+                    return process
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.1)
+    stop_server(process)
+    raise AssertionError("Server failed to start; is MongoDB running?")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def post_json(url, payload):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.getcode(), json.loads(response.read().decode()), response.headers
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read().decode() or "{}"), e.headers
+
+def test_concurrent_signup(port=DEFAULT_PORT):
+    process = start_server(port)
+    try:
+        check_concurrent_signup(port)
+    finally:
+        stop_server(process)
+
+def check_concurrent_signup(port):
+    base_url = f"http://127.0.0.1:{port}/api/v1/auth"
+    timestamp = int(time.time())
+    email = f"race_{timestamp}@example.com"
+    password = "securepassword123"
+
+    # 1. Fire the same signup from many threads at once, varying the case
+    # of the address, which must still count as the same account
+    start = threading.Barrier(CONCURRENT_SIGNUPS)
+    def signup(i):
+        start.wait()
+        variant = email.upper() if i % 2 else email
+        return post_json(f"{base_url}/signup", {"email": variant, "password": password})
+
+    print(f"Sending {CONCURRENT_SIGNUPS} concurrent signups for {email}...")
+    with ThreadPoolExecutor(max_workers=CONCURRENT_SIGNUPS) as pool:
+        results = list(pool.map(signup, range(CONCURRENT_SIGNUPS)))
+
+    statuses = sorted(status for status, _, _ in results)
+    print(f"Statuses: {statuses}")
+
+    # 2. Exactly one account is created; every other attempt reached the
+    # insert and was rejected as a duplicate by the unique index
+    assert statuses == [201] + [400] * (CONCURRENT_SIGNUPS - 1), \
+        f"Expected one 201 and {CONCURRENT_SIGNUPS - 1} 400s, got {statuses}"
+    created = [body for status, body, _ in results if status == 201]
+    assert created[0]["email"] == email, f"Expected the email stored lowercased, got {created[0]['email']}"
+
+    # 3. The account works, whatever case the address is typed in
+    status, body, _ = post_json(f"{base_url}/login", {"email": email.upper(), "password": password})
+    assert status == 200 and "access_token" in body, f"Login failed. Status: {status}, body: {body}"
+
+    print("Exactly one account created under concurrent signups.")
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    test_concurrent_signup(port)
@@ -0,0 +1,50 @@
+import urllib.request
+import urllib.error
+
+BASE_URL = "http://127.0.0.1:8000/api/v1"
+
+CATALOG_URLS = [
+    f"{BASE_URL}/themes",
+    f"{BASE_URL}/themes/roman-empire",
+    f"{BASE_URL}/objects/obj-001",
+    f"{BASE_URL}/tours/roman-empire/Small",
+]
+
+def test_etags():
+    print("Testing ETag / If-None-Match on catalog endpoints...")
+
+    for url in CATALOG_URLS:
+        print(f"\nFetching {url}...")
+        try:
+            with urllib.request.urlopen(url) as response:
+                etag = response.headers.get("ETag")
+                cache_control = response.headers.get("Cache-Control")
+                print(f"Status: {response.getcode()}, ETag: {etag}, Cache-Control: {cache_control}")
+                assert etag, "Missing ETag header"
+                assert cache_control, "Missing Cache-Control header"
+        except urllib.error.HTTPError as e:
+            raise AssertionError(f"Failed to fetch {url}. Status: {e.code}: {e.read().decode()}")
+        except urllib.error.URLError as e:
+            print(f"Connection failed: {e.reason}")
+            print("Make sure the server is running.")
+            return
+
+        # Revalidate with the ETag we just received
+        req = urllib.request.Request(url, headers={"If-None-Match": etag})
+        try:
+            with urllib.request.urlopen(req) as response:
+                raise AssertionError(f"Expected 304, got {response.getcode()}")
+        except urllib.error.HTTPError as e:
+            assert e.code == 304, f"Expected 304, got {e.code}"
+            assert e.headers.get("ETag") == etag
+            assert e.read() == b""
+            print("Caught expected 304 Not Modified with empty body.")
+
+        # A stale ETag must still get the full body
+        req = urllib.request.Request(url, headers={"If-None-Match": '"stale"'})
+        with urllib.request.urlopen(req) as response:
+            assert response.getcode() == 200
+            print("Stale ETag correctly returned 200 with body.")
+
+if __name__ == "__main__":
+    test_etags()
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from images import ImageResolver, placeholder_image
+
+# Queries the stub answers with 429 once before succeeding, and with no photos
+FLAKY_QUERY = "Roman Gladius"
+MISSING_QUERY = "Nothing Matches This"
+
+
+class StubPexels(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for the Pexels search endpoint.
+    """
+    calls = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["query"][0]
+        StubPexels.calls.append(query)
+
+        if query == FLAKY_QUERY and StubPexels.calls.count(query) == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        photos = [] if query == MISSING_QUERY else [{"src": {"large": f"https://images.test/{query.replace(' ', '-')}.jpg"}}]
+        body = json.dumps({"photos": photos}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_image_resolver():
+    print("Testing concurrent image resolution against a stub Pexels server...")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPexels)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    queries = ["Bronze Age Sword", FLAKY_QUERY, "Bust of Nefertiti", MISSING_QUERY, "Bronze Age Sword"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "image_cache.json")
+
+        def resolver():
+            return ImageResolver(
+                api_key="test-key", base_url=base_url, cache_path=cache_path,
+                rate=100, burst=10, concurrency=4, backoff=0.01,
+            )
+
+        try:
+            # 1. Cold run: every unique query hits the stub, the 429 is retried
+            first = resolver()
+            images = asyncio.run(first.resolve_many(queries))
+            print(f"Cold run: {first.api_calls} API calls")
+            assert images["Bronze Age Sword"] == "https://images.test/Bronze-Age-Sword.jpg"
+            assert images[FLAKY_QUERY] == "https://images.test/Roman-Gladius.jpg"
+            assert images[MISSING_QUERY] == placeholder_image(MISSING_QUERY)
+            assert StubPexels.calls.count(FLAKY_QUERY) == 2, "429 should be retried once"
+            assert StubPexels.calls.count("Bronze Age Sword") == 1, "Duplicate queries should be fetched once"
+
+            # 2. Warm run: resolved queries come from the on-disk cache
+            StubPexels.calls.clear()
+            second = resolver()
+            cached = asyncio.run(second.resolve_many(queries))
+            print(f"Warm run: {second.api_calls} API calls ({StubPexels.calls})")
+            assert cached == images
+            assert StubPexels.calls == [MISSING_QUERY], "Only the unresolved query should be retried"
+        finally:
+            server.shutdown()
+
+    print("Image resolver OK")
+
+
+if __name__ == "__main__":
+    test_image_resolver()
@@ -0,0 +1,67 @@
+import urllib.request
+import urllib.error
+import urllib.parse
+import json
+
+BASE_URL = "http://127.0.0.1:8000/api/v1/search"
+
+def search(**params):
+    url = f"{BASE_URL}?" + urllib.parse.urlencode(params)
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read().decode())
+
+def test_search():
+    print("Testing object search...")
+
+    try:
+        # 1. A distinctive name finds its object first
+        print("\n1. Searching for 'Nefertiti'...")
+        body = search(q="Nefertiti")
+        print(f"Total: {body['total']}, top hit: {body['results'][0]['title'] if body['results'] else None}")
+        assert body["total"] >= 1
+        assert "Nefertiti" in body["results"][0]["title"]
+
+        # 2. Results are ranked by score
+        print("\n2. Searching for 'sword'...")
+        body = search(q="sword", limit=50)
+        scores = [hit["score"] for hit in body["results"]]
+        print(f"Total: {body['total']}, titles: {[hit['title'] for hit in body['results'][:5]]}")
+        assert body["total"] >= 2
+        assert scores == sorted(scores, reverse=True), "Results should be sorted by score"
+
+        # 3. Pagination walks the same ranking
+        print("\n3. Paging through 'sword' one result at a time...")
+        second = search(q="sword", offset=1, limit=1)
+        assert second["results"][0]["id"] == body["results"][1]["id"]
+        assert second["total"] == body["total"]
+        print("Second page matches the second ranked result.")
+
+        # 4. The theme filter narrows results
+        print("\n4. Filtering 'sword' to the roman-empire theme...")
+        filtered = search(q="sword", theme="roman-empire")
+        print(f"Total: {filtered['total']}")
+        assert filtered["total"] <= body["total"]
+
+        # 5. Unknown words return nothing
+        body = search(q="xylophonequasar")
+        assert body["total"] == 0 and body["results"] == []
+        print("\nNo results for an unknown word.")
+    except urllib.error.HTTPError as e:
+        print(f"Search failed. Status: {e.code}")
+        print(e.read().decode())
+        return
+    except urllib.error.URLError as e:
+        print(f"Connection failed: {e.reason}")
+        print("Make sure the server is running.")
+        return
+
+    # 6. An empty query is rejected
+    try:
+        search(q="")
+        print("Error: Expected 422 for an empty query")
+    except urllib.error.HTTPError as e:
+        assert e.code == 422
+        print("Empty query rejected with 422.")
+
+if __name__ == "__main__":
+    test_search()
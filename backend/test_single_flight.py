@@ -0,0 +1,139 @@
+import asyncio
+
+from cache import SingleFlight
+
+# Exercises cache.SingleFlight directly; no server or database needed.
+
+
+def test_waiters_share_one_load():
+    print("Testing that concurrent waiters share one load...")
+
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        waiters = [asyncio.ensure_future(flights.do("key", load)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1, f"Expected 1 load, got {calls}"
+        assert results == ["value"] * 10
+        assert flights.coalesced == 9
+        assert len(flights) == 0, "Finished flight is still registered"
+
+    asyncio.run(run())
+    print("10 waiters shared a single load.")
+
+
+def test_error_reaches_every_waiter():
+    print("Testing that a failed load raises in every waiter...")
+
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            raise ValueError("load failed")
+
+        waiters = [asyncio.ensure_future(flights.do("key", load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results), results
+        assert len(flights) == 0
+
+    asyncio.run(run())
+    print("All 5 waiters got the ValueError.")
+
+
+def test_cancelling_one_waiter_keeps_the_load():
+    print("Testing that cancelling one waiter doesn't cancel the others...")
+
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        cancelled = asyncio.ensure_future(flights.do("key", load))
+        others = [asyncio.ensure_future(flights.do("key", load)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert cancelled.cancelled()
+
+        release.set()
+        assert await asyncio.gather(*others) == ["value"] * 3
+        assert calls == 1
+
+    asyncio.run(run())
+    print("Remaining waiters got the result from the original load.")
+
+
+def test_request_after_last_cancel_starts_fresh_load():
+    print("Testing that a request after the last waiter is cancelled starts a fresh load...")
+
+    async def run():
+        flights = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                # Wind down slowly, leaving a window for a new request to
+                # join the dying task
+                await asyncio.sleep(0.01)
+                raise
+            return "value"
+
+        first = asyncio.ensure_future(flights.do("key", load))
+        # Let the load start and block
+        await asyncio.sleep(0.001)
+        first.cancel()
+        await asyncio.sleep(0)
+        assert first.cancelled()
+
+        # The first load is still cancelling
+        second = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0.001)
+        assert calls == 2, f"Expected a fresh load, got {calls} loads"
+
+        # Once the old task is done, its callback must leave the new flight
+        # registered, so later requests still join it
+        await asyncio.sleep(0.02)
+        assert len(flights) == 1
+        third = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(second, third) == ["value", "value"]
+        assert calls == 2
+
+    asyncio.run(run())
+    print("Late request started its own load and got the result.")
+
+
+if __name__ == "__main__":
+    test_waiters_share_one_load()
+    test_error_reaches_every_waiter()
+    test_cancelling_one_waiter_keeps_the_load()
+    test_request_after_last_cancel_starts_fresh_load()
@@ -0,0 +1,81 @@
+import math
+import random
+
+from spatial import SpatialIndex
+
+# Checks SpatialIndex.nearby's ring search against a brute-force scan of
+# every object; no server or database needed.
+
+THEMES = ["roman-empire", "ancient-egypt", "warfare", "daily-life"]
+QUERIES = 200
+
+
+def make_objects(rng, count):
+    objects = []
+    for i in range(count):
+        floor = rng.randint(1, 3)
+        # Whole-number positions on a coarse grid make equal distances
+        # common, so tie-breaking is exercised too
+        x = float(rng.randint(0, 50) * 2)
+        y = float(rng.randint(0, 50) * 2)
+        objects.append({
+            "_id": f"obj-{i:05d}",
+            "title": f"Object {i}",
+            "image": f"https://example.com/{i}.jpg",
+            "galleryLocation": f"Floor {floor}, Room {100 + i % 20}",
+            "mapPosition": {"top": f"{y}%", "left": f"{x}%"},
+            "themeIds": rng.sample(THEMES, rng.randint(1, 2)),
+            "location": {"floor": floor, "room": 100 + i % 20, "x": x, "y": y},
+        })
+    return objects
+
+
+def brute_force(objects, floor, x, y, radius, theme, limit):
+    """
+    Every matching object within the radius, nearest first, ties broken by
+    insertion order, as nearby() promises.
+    """
+    hits = []
+    for number, obj in enumerate(objects):
+        location = obj["location"]
+        if location["floor"] != floor:
+            continue
+        if theme is not None and theme not in obj["themeIds"]:
+            continue
+        distance = math.hypot(location["x"] - x, location["y"] - y)
+        if distance <= radius:
+            hits.append((distance, number))
+    hits.sort()
+    return [(objects[number]["_id"], round(distance, 3)) for distance, number in hits[:limit]]
+
+
+def test_nearby_matches_brute_force():
+    print("Testing nearby() against a brute-force scan...")
+    rng = random.Random(20)
+    objects = make_objects(rng, 3000)
+
+    # Cell sizes both smaller and larger than typical radii
+    for cell_size in (2, 5, 13):
+        index = SpatialIndex(objects, cell_size=cell_size)
+        for _ in range(QUERIES):
+            floor = rng.randint(1, 3)
+            x = rng.uniform(0, 100)
+            y = rng.uniform(0, 100)
+            if rng.random() < 0.5:
+                # On the grid, many objects are at the same distance
+                x, y = float(round(x)), float(round(y))
+            radius = rng.choice((1, 5, 15, 50, 150))
+            theme = rng.choice((None, *THEMES))
+            limit = rng.choice((1, 5, 50, 200))
+
+            got = [(hit["id"], hit["distance"]) for hit in index.nearby(floor, x, y, radius, theme, limit)]
+            expected = brute_force(objects, floor, x, y, radius, theme, limit)
+            assert got == expected, (
+                f"cell_size={cell_size} nearby({floor}, {x}, {y}, {radius}, {theme}, {limit}) "
+                f"returned {got[:5]}..., expected {expected[:5]}..."
+            )
+        print(f"cell_size={cell_size}: {QUERIES} queries match.")
+
+
+if __name__ == "__main__":
+    test_nearby_matches_brute_force()
@@ -0,0 +1,91 @@
+import random
+
+from locations import Location
+from tour_planner import TOUR_ENTRANCE, nearest_neighbour, plan_route, route_cost, two_opt
+
+# Exercises the route planner directly on fixed, seeded locations; no
+# server or database needed.
+
+
+def random_locations(rng, count, floors=(1, 2, 3)):
+    return [
+        Location(floor=rng.choice(floors), room=100 + i, x=rng.uniform(0, 100), y=rng.uniform(0, 100))
+        for i in range(count)
+    ]
+
+
+def floor_changes(locations, route):
+    floors = [locations[i].floor for i in route]
+    return sum(1 for a, b in zip(floors, floors[1:]) if a != b)
+
+
+def test_two_opt_never_longer():
+    print("Testing that 2-opt never lengthens the nearest-neighbour route...")
+    rng = random.Random(19)
+    for trial in range(50):
+        locations = random_locations(rng, rng.randint(2, 40))
+        count = rng.randint(1, len(locations))
+        greedy = nearest_neighbour(TOUR_ENTRANCE, locations, range(len(locations)), count)
+        improved = two_opt(TOUR_ENTRANCE, locations, greedy)
+
+        assert sorted(improved) == sorted(greedy), "2-opt must only reorder the chosen stops"
+        assert route_cost(TOUR_ENTRANCE, [locations[i] for i in improved]) <= \
+            route_cost(TOUR_ENTRANCE, [locations[i] for i in greedy]) + 1e-9, f"Trial {trial}: 2-opt made the route longer"
+        assert plan_route(locations, count) == improved
+    print("2-opt routes were never longer over 50 trials.")
+
+
+def test_floor_change_penalty_groups_floors():
+    print("Testing that tours finish a floor before changing floors...")
+    # Two floors with stops at the same spots, listed interleaved so index
+    # order alone would zig-zag between them
+    spots = [(20.0, 80.0), (40.0, 60.0), (60.0, 40.0), (80.0, 20.0)]
+    locations = []
+    for i, (x, y) in enumerate(spots):
+        locations.append(Location(floor=1, room=100 + i, x=x, y=y))
+        locations.append(Location(floor=2, room=200 + i, x=x, y=y))
+
+    route = plan_route(locations)
+    assert floor_changes(locations, route) == 1, f"Expected one floor change, got route {route}"
+    assert locations[route[0]].floor == TOUR_ENTRANCE.floor, "Tours should start on the entrance floor"
+
+    # Starting upstairs finishes that floor first
+    first = 1
+    route = plan_route(locations, first=first)
+    assert floor_changes(locations, route) == 1, f"Expected one floor change, got route {route}"
+    assert all(locations[i].floor == 2 for i in route[:len(spots)])
+    print("Stops were grouped by floor.")
+
+
+def test_start_is_honoured():
+    print("Testing that the start object is the first stop...")
+    rng = random.Random(190)
+    locations = random_locations(rng, 25)
+    for first in (0, 7, 24):
+        for count in (1, 5, 25):
+            route = plan_route(locations, count, first=first)
+            assert route[0] == first
+            assert len(route) == count and len(set(route)) == count
+    print("Every route started at the requested object.")
+
+
+def test_empty_and_single_stop():
+    print("Testing empty and single-stop inputs...")
+    only = [Location(floor=2, room=201, x=10.0, y=10.0)]
+
+    assert plan_route([]) == []
+    assert plan_route([], count=5) == []
+    assert plan_route(only, count=0) == []
+    assert plan_route(only) == [0]
+    assert plan_route(only, count=10) == [0]
+    assert plan_route(only, first=0) == [0]
+    assert two_opt(TOUR_ENTRANCE, only, []) == []
+    assert two_opt(TOUR_ENTRANCE, only, [0]) == [0]
+    print("Empty and single-stop inputs planned correctly.")
+
+
+if __name__ == "__main__":
+    test_two_opt_never_longer()
+    test_floor_change_penalty_groups_floors()
+    test_start_is_honoured()
+    test_empty_and_single_stop()
@@ -0,0 +1,97 @@
+import math
+import os
+from typing import List, Optional, Sequence
+
+from locations import Location
+
+# Cost of changing floors, in map-percentage units (crossing a floor's map
+# edge to edge is 100), per floor climbed or descended
+TOUR_FLOOR_CHANGE_PENALTY = float(os.getenv("TOUR_FLOOR_CHANGE_PENALTY", 100))
+TOUR_TWO_OPT_MAX_PASSES = int(os.getenv("TOUR_TWO_OPT_MAX_PASSES", 50))
+
+# Routes without an explicit start begin at the main entrance: bottom centre
+# of the ground floor map
+TOUR_ENTRANCE = Location(floor=1, room=0, x=50.0, y=100.0)
+
+
+def walking_cost(a: Location, b: Location) -> float:
+    return math.hypot(a.x - b.x, a.y - b.y) + TOUR_FLOOR_CHANGE_PENALTY * abs(a.floor - b.floor)
+
+
+def route_cost(origin: Location, stops: Sequence[Location]) -> float:
+    total = 0.0
+    current = origin
+    for stop in stops:
+        total += walking_cost(current, stop)
+        current = stop
+    return total
+
+
+def nearest_neighbour(origin: Location, locations: Sequence[Location], candidates, count: int) -> List[int]:
+    """
+    Greedily picks `count` of the candidate indices, each time walking to the
+    closest one not yet visited. Ties go to the lower index, so plans are
+    deterministic.
+    """
+    remaining = set(candidates)
+    route = []
+    current = origin
+    while remaining and len(route) < count:
+        nearest = min(remaining, key=lambda i: (walking_cost(current, locations[i]), i))
+        remaining.remove(nearest)
+        route.append(nearest)
+        current = locations[nearest]
+    return route
+
+
+def two_opt(origin: Location, locations: Sequence[Location], route: List[int]) -> List[int]:
+    """
+    Improves an open route from a fixed origin by reversing segments while
+    that shortens it. The route's end is free, so reversing a tail only
+    costs its new first edge.
+    """
+    path = list(route)
+    n = len(path)
+
+    def at(i):
+        return origin if i < 0 else locations[path[i]]
+
+    for _ in range(TOUR_TWO_OPT_MAX_PASSES):
+        improved = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                a, b, c = at(i - 1), at(i), at(j)
+                delta = walking_cost(a, c) - walking_cost(a, b)
+                if j + 1 < n:
+                    d = at(j + 1)
+                    delta += walking_cost(b, d) - walking_cost(c, d)
+                if delta < -1e-9:
+                    path[i:j + 1] = reversed(path[i:j + 1])
+                    improved = True
+        if not improved:
+            break
+    return path
+
+
+def plan_route(locations: Sequence[Location], count: Optional[int] = None, origin: Optional[Location] = None, first: Optional[int] = None) -> List[int]:
+    """
+    Chooses and orders up to `count` of `locations` (all of them by default)
+    into a short walk, returning their indices in visiting order.
+
+    The walk starts at `origin` (the entrance by default), or at the
+    location with index `first`, which is then always the first stop. Stops
+    are picked nearest-neighbour first and the route is then refined with
+    2-opt; floor changes are penalised so tours finish a floor before moving.
+    """
+    count = len(locations) if count is None else min(count, len(locations))
+    if count <= 0:
+        return []
+
+    candidates = range(len(locations))
+    if first is not None:
+        origin = locations[first]
+        rest = nearest_neighbour(origin, locations, (i for i in candidates if i != first), count - 1)
+        return [first] + two_opt(origin, locations, rest)
+
+    origin = origin or TOUR_ENTRANCE
+    return two_opt(origin, locations, nearest_neighbour(origin, locations, candidates, count))
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from database import DB_NAME
+from indexes import HOT_QUERIES, ensure_indexes, explain_query
+
+load_dotenv()
+
+MONGODB_URI = os.getenv("MONGODB_URI")
+if not MONGODB_URI:
+    print("Error: MONGODB_URI not found in environment variables.")
+    exit(1)
+
+async def verify():
+    client = AsyncIOMotorClient(MONGODB_URI)
+    db = client[DB_NAME]
+    failures = []
+
+    try:
+        print("--- Index Verification Start ---")
+
+        created = await ensure_indexes(db)
+        print(f"Indexes ensured: {', '.join(created)}\n")
+
+        for query in HOT_QUERIES:
+            stages = await explain_query(db, query)
+            verdict = "FAIL" if "COLLSCAN" in stages else "ok"
+            print(f"[{verdict}] {query.name} ({query.collection}): {' <- '.join(stages)}")
+            if verdict == "FAIL":
+                failures.append(query.name)
+
+        print("\n--- Index Verification End ---")
+
+    finally:
+        client.close()
+
+    if failures:
+        print(f"COLLSCAN in hot queries: {', '.join(failures)}")
+        return False
+    return True
+
+if __name__ == "__main__":
+    success = asyncio.run(verify())
+    if not success:
+        sys.exit(1)
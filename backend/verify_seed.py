@@ -2,6 +2,7 @@ import asyncio
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
+from database import DB_NAME
 
 load_dotenv()
 
@@ -12,7 +13,7 @@ if not MONGODB_URI:
 
 async def verify():
     client = AsyncIOMotorClient(MONGODB_URI)
-    db = client["museum_tour"]
+    db = client[DB_NAME]
 
     try:
         print("--- Verification Start ---")
@@ -1,4 +1,4 @@
-import { MuseumTheme, MuseumObject } from "@/types";
+import { MuseumTheme, MuseumObject, ObjectLocation } from "@/types";
 
 const API_BASE_URL = "https://gentle-jackrabbit-twirl-backend.onrender.com/api/v1";
 
@@ -26,8 +26,68 @@ export async function fetchObject(id: string): Promise<MuseumObject> {
   return response.json();
 }
 
-export async function fetchTour(themeId: string, size: string): Promise<MuseumObject[]> {
-  const response = await fetch(`${API_BASE_URL}/tours/${themeId}/${size}`);
+export interface ObjectBatch {
+  objects: MuseumObject[];
+  missing: string[];
+}
+
+export async function fetchObjects(ids: string[]): Promise<ObjectBatch> {
+  const params = new URLSearchParams({ ids: ids.join(",") });
+  const response = await fetch(`${API_BASE_URL}/objects?${params}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch objects: ${response.statusText}`);
+  }
+  return response.json();
+}
+
+export interface SearchHit extends Pick<MuseumObject, "id" | "title" | "image" | "galleryLocation" | "mapPosition"> {
+  score: number;
+}
+
+export interface SearchResults {
+  total: number;
+  offset: number;
+  limit: number;
+  results: SearchHit[];
+}
+
+export async function searchObjects(q: string, options: { theme?: string; offset?: number; limit?: number } = {}): Promise<SearchResults> {
+  const params = new URLSearchParams({ q });
+  if (options.theme) params.set("theme", options.theme);
+  if (options.offset !== undefined) params.set("offset", String(options.offset));
+  if (options.limit !== undefined) params.set("limit", String(options.limit));
+  const response = await fetch(`${API_BASE_URL}/search?${params}`);
+  if (!response.ok) {
+    throw new Error(`Failed to search objects: ${response.statusText}`);
+  }
+  return response.json();
+}
+
+export interface NearbyObject extends Pick<MuseumObject, "id" | "title" | "image" | "galleryLocation" | "mapPosition"> {
+  location: ObjectLocation;
+  distance: number;
+}
+
+export async function fetchNearbyObjects(
+  floor: number,
+  x: number,
+  y: number,
+  options: { radius?: number; theme?: string; limit?: number } = {}
+): Promise<NearbyObject[]> {
+  const params = new URLSearchParams({ floor: String(floor), x: String(x), y: String(y) });
+  if (options.radius !== undefined) params.set("radius", String(options.radius));
+  if (options.theme) params.set("theme", options.theme);
+  if (options.limit !== undefined) params.set("limit", String(options.limit));
+  const response = await fetch(`${API_BASE_URL}/objects/nearby?${params}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch nearby objects: ${response.statusText}`);
+  }
+  return response.json();
+}
+
+export async function fetchTour(themeId: string, size: string, start?: string): Promise<MuseumObject[]> {
+  const query = start ? `?${new URLSearchParams({ start })}` : "";
+  const response = await fetch(`${API_BASE_URL}/tours/${themeId}/${size}${query}`);
   if (!response.ok) {
     throw new Error(`Failed to fetch tour: ${response.statusText}`);
   }
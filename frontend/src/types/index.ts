@@ -7,6 +7,13 @@ export interface MuseumTheme {
   image: string;
 }
 
+export interface ObjectLocation {
+  floor: number;
+  room: number;
+  x: number;
+  y: number;
+}
+
 export interface MuseumObject {
   id: string;
   title: string;
@@ -16,6 +23,7 @@ export interface MuseumObject {
   image: string;
   themeIds: string[];
   mapPosition: { top: string; left: string };
+  location?: ObjectLocation | null;
 }
 
 export interface Tour {